@@ -0,0 +1,190 @@
+"""Scale the number of hubs and the scan interval against simulated controllers.
+
+For every combination of --hubs and --intervals the harness starts N
+simulated controllers on a loop of their own and N hubs with all entities
+in a Home Assistant core instance, polls for --duration seconds and reports:
+
+    loop lag   p50 / p95 / p99 / max delay of a 50 ms probe timer on the HA loop
+    executor   mean / max number of jobs waiting for an executor thread
+    memory     Python memory allocated per hub until its first cycle completed
+    missed     share of scheduled cycles that did not deliver data
+
+The entities write their state to the state machine like the platform
+entities do. Run from the repository root with Home Assistant and pymodbus
+installed:
+
+    python benchmarks/fleet.py --hubs 1 10 30 --intervals 5 1 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.home_heat_control.homeheatcontrol import HomeHeatControl  # noqa: E402
+from custom_components.home_heat_control.profiles import compile_profile, load_profiles, select_profile  # noqa: E402
+from custom_components.home_heat_control.simulator import async_start_simulator, async_stop_simulator  # noqa: E402
+
+PLATFORMS = ["sensor", "binary_sensor", "switch", "button", "number", "time", "select"]
+PROBE_INTERVAL = 0.05
+#the executor size of Home Assistant's runner
+EXECUTOR_WORKERS = 64
+
+
+class _Entity:
+    """Writes the decoded value to the state machine like the platform entities"""
+
+    def __init__(self, hass, hub_name, platform, entity_info):
+        self.hass = hass
+        self.entity_id = f"{platform}.{hub_name}_{entity_info.description.key.lower()}"
+        self._slaveId = entity_info.slave
+        self._address = entity_info.address
+        self.entity_description = entity_info.description
+        self._data = None
+
+    def _modbus_data_updated(self):
+        self.hass.states.async_set(self.entity_id, str(self._data))
+
+
+class _Simulators:
+    """N simulated controllers on a loop and thread of their own"""
+
+    def __init__(self, count, port, rtt):
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        self.ports = [port + index for index in range(count)]
+        self._running = [
+            asyncio.run_coroutine_threadsafe(async_start_simulator(port=port, latency=rtt, seed=port), self._loop).result()
+            for port in self.ports
+        ]
+
+    def stop(self):
+        for server, _controller, task in self._running:
+            asyncio.run_coroutine_threadsafe(async_stop_simulator(server, task), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+async def _probe(samples, executor, stop):
+    """loop lag and executor queue depth"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples["lag"].append(max(loop.time() - expected, 0))
+        samples["queue"].append(executor._work_queue.qsize())
+
+
+async def _run(hubs, interval, duration, ports, profile, config_dir):
+    executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="SyncWorker")
+    asyncio.get_running_loop().set_default_executor(executor)
+    hass = HomeAssistant(config_dir)
+
+    #memory of the hubs until the first cycle of each delivered data
+    tracemalloc.start()
+    memory_start = tracemalloc.get_traced_memory()[0]
+    delivered = [0] * hubs
+    fleet = []
+    for index in range(hubs):
+        name = f"fleet{index}"
+        hub = HomeHeatControl(hass, name, "127.0.0.1", ports[index], 0, interval, profile)
+        refresh = hub.async_refresh_modbus_data
+
+        async def counted_refresh(_now=None, index=index, hub=hub, refresh=refresh):
+            received = hub._last_data_received_timestamp
+            await refresh(_now)
+            if hub._last_data_received_timestamp != received:
+                delivered[index] += 1
+
+        #the interval timer of the first entity calls the counting wrapper
+        hub.async_refresh_modbus_data = counted_refresh
+        entities = [
+            _Entity(hass, name, platform, entity_info)
+            for platform in PLATFORMS
+            for entity_info in hub.get_platform_entities(platform)
+        ]
+        for entity in entities:
+            hub.async_add_homeheatcontrol_sensor(entity)
+        fleet.append((hub, entities))
+    await asyncio.gather(*(hub.async_refresh_modbus_data() for hub, _entities in fleet))
+    memory_per_hub = (tracemalloc.get_traced_memory()[0] - memory_start) / hubs
+    tracemalloc.stop()
+    #the first cycle is not counted
+    delivered[:] = [0] * hubs
+
+    samples = {"lag": [], "queue": []}
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(samples, executor, stop))
+    await asyncio.sleep(duration)
+    stop.set()
+    await probe
+
+    for hub, entities in fleet:
+        for entity in entities:
+            hub.async_remove_homeheatcontrol_sensor(entity)
+    await hass.async_stop(force=True)
+    executor.shutdown(wait=True)
+
+    expected = hubs * int(duration / interval)
+    lags = sorted(samples["lag"])
+    return {
+        "hubs": hubs,
+        "interval": interval,
+        "lag_p50_ms": round(statistics.median(lags) * 1000, 2),
+        "lag_p95_ms": round(lags[int(len(lags) * 0.95)] * 1000, 2),
+        "lag_p99_ms": round(lags[int(len(lags) * 0.99)] * 1000, 2),
+        "lag_max_ms": round(lags[-1] * 1000, 2),
+        "queue_mean": round(statistics.mean(samples["queue"]), 2),
+        "queue_max": max(samples["queue"]),
+        "memory_per_hub_kib": round(memory_per_hub / 1024, 1),
+        "missed": round(max(expected - sum(delivered), 0) / expected, 3) if expected else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hubs", type=int, nargs="+", default=[1, 10, 30])
+    parser.add_argument("--intervals", type=float, nargs="+", default=[5, 1])
+    parser.add_argument("--duration", type=float, default=30, help="seconds per combination")
+    parser.add_argument("--rtt", type=float, default=5, help="response time of the simulated controllers in ms")
+    parser.add_argument("--port", type=int, default=5300)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    soft_limit, _hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    print(f"open file limit {soft_limit}, every hub and every simulated controller uses one socket")
+    profile = compile_profile(select_profile(load_profiles(), None))
+    results = []
+    for hubs in args.hubs:
+        simulators = _Simulators(hubs, args.port, args.rtt)
+        try:
+            for interval in args.intervals:
+                with tempfile.TemporaryDirectory() as config_dir:
+                    start = time.perf_counter()
+                    result = asyncio.run(_run(hubs, interval, args.duration, simulators.ports, profile, config_dir))
+                results.append(result)
+                print(f"{hubs:4d} hubs every {interval:4.1f} s: loop lag p50 {result['lag_p50_ms']:7.2f} ms "
+                      f"p95 {result['lag_p95_ms']:7.2f} ms p99 {result['lag_p99_ms']:7.2f} ms max {result['lag_max_ms']:7.2f} ms, "
+                      f"executor queue {result['queue_mean']:.1f} (max {result['queue_max']}), "
+                      f"{result['memory_per_hub_kib']:.0f} KiB/hub, missed {result['missed']:.1%} "
+                      f"({time.perf_counter() - start:.0f} s)")
+        finally:
+            simulators.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Check the import time of the integration package against a budget.
+
+Run from the repository root with Home Assistant installed:
+
+    python benchmarks/import_time.py --budget-ms 50
+
+The modules Home Assistant core has loaded before it imports an integration
+are imported first, so only the cost added by this package is measured.
+Exits with status 1 if the budget is exceeded.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "custom_components.home_heat_control"
+PRELOADED = [
+    "voluptuous",
+    "homeassistant.const",
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+]
+
+
+def measure():
+    """Return the cumulative import time of the package in milliseconds."""
+    code = ";".join(f"import {module}" for module in PRELOADED + [PACKAGE])
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    for line in process.stderr.splitlines():
+        #import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == PACKAGE:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"{PACKAGE} not found in the import time report")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    best = min(measure() for _round in range(args.rounds))
+    print(f"{PACKAGE}: {best:.1f} ms (budget {args.budget_ms:.1f} ms)")
+    if best > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
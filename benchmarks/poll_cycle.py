@@ -0,0 +1,251 @@
+"""Measure what a poll cycle, an on-demand refresh and a write cost against the simulated controller.
+
+Every scenario runs the hub against simulator.py in a thread of its own
+with --rtt ms response time and reports per operation:
+
+    transactions  Modbus requests seen by the simulator
+    wall          p50 / p95 of the whole operation
+    executor      time spent in executor jobs
+    decode        CPU time of the decoders
+    loop          time on the event loop, wall minus executor
+    fan-out       entity updates (_modbus_data_updated) per operation
+
+Exits with 1 if transactions per operation or p95 grow past the stored
+baseline by more than --transaction-tolerance or --tolerance,
+--update-baseline stores the current results. Run from the repository root with Home Assistant and
+pymodbus installed:
+
+    python benchmarks/poll_cycle.py --rtt 5 --cycles 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.home_heat_control.homeheatcontrol import HomeHeatControl  # noqa: E402
+from custom_components.home_heat_control.profiles import compile_profile, load_profiles, select_profile  # noqa: E402
+from custom_components.home_heat_control.simulator import async_start_simulator, async_stop_simulator  # noqa: E402
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "poll_cycle_baseline.json")
+PLATFORMS = ["sensor", "binary_sensor", "switch", "button", "number", "time", "select"]
+REFRESH_KEYS = ["outsidetemperature", "heatcircuit_1_status", "warmwater_boiler_temperature"]
+WRITE_KEYS = [
+    "heatcircuit_1_curve_inclination",
+    "heatcircuit_1_curve_niveau",
+    "heatcircuit_1_curve_targettemperature_day",
+    "heatcircuit_1_curve_targettemperature_night",
+]
+
+#scenario: operation, simulator options
+SCENARIOS = {
+    "poll": ("poll", {}),
+    "poll-strict": ("poll", {"strict": True}),
+    "refresh": ("refresh", {}),
+    "write": ("write", {}),
+    "write-no-fc23": ("write", {"readwrite": False}),
+}
+
+
+class _BenchHass:
+    """Just enough of hass for the hub, executor jobs are timed"""
+
+    def __init__(self, config_dir):
+        self.data = {}
+        self.config = SimpleNamespace(path=lambda *parts: os.path.join(config_dir, *parts), config_dir=config_dir)
+        self.executor_time = 0
+        self._executor = ThreadPoolExecutor(max_workers=4)
+
+    def _timed(self, target, *args):
+        start = time.perf_counter()
+        try:
+            return target(*args)
+        finally:
+            self.executor_time += time.perf_counter() - start
+
+    def async_add_executor_job(self, target, *args):
+        return asyncio.get_running_loop().run_in_executor(self._executor, self._timed, target, *args)
+
+    def async_create_task(self, target):
+        return asyncio.get_running_loop().create_task(target)
+
+
+class _Entity:
+    def __init__(self, entity_info):
+        self._slaveId = entity_info.slave
+        self._address = entity_info.address
+        self.entity_description = entity_info.description
+        self._data = None
+        self.updates = 0
+
+    def _modbus_data_updated(self):
+        self.updates += 1
+
+
+class _DecodeTimer:
+    def __init__(self):
+        self.time = 0
+
+    def wrap(self, decoder):
+        def decode(registers):
+            start = time.perf_counter()
+            try:
+                return decoder(registers)
+            finally:
+                self.time += time.perf_counter() - start
+        return decode
+
+
+def _start_simulator(port, rtt, options):
+    """run the simulator on a loop of its own so it does not share the hub's loop"""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    result = {}
+
+    async def run():
+        result["server"], result["controller"], result["task"] = await async_start_simulator(
+            port=port, latency=rtt, seed=1, **options
+        )
+        started.set()
+
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(run(), loop)
+    started.wait()
+    return loop, result
+
+
+async def _run_scenario(operation, port, profile, operations, config_dir, controller):
+    hass = _BenchHass(config_dir)
+    hub = HomeHeatControl(hass, f"bench{port}", "127.0.0.1", port, 0, 5, profile)
+    #the benchmark measures the cycle, not the storage helpers
+    hub._async_save_register_map = lambda: None
+    entities = [_Entity(entity_info) for platform in PLATFORMS for entity_info in hub.get_platform_entities(platform)]
+    hub._sensors.extend(entities)
+    decode_timer = _DecodeTimer()
+    build_read_plan = hub._build_read_plan
+
+    def build_timed_read_plan():
+        #pruning rebuilds the plan, the decoders of every plan are timed
+        build_read_plan()
+        hub._polled = [(sensor, attribute, decode_timer.wrap(decoder), registers) for sensor, attribute, decoder, registers in hub._polled]
+
+    hub._build_read_plan = build_timed_read_plan
+    hub._build_read_plan()
+    refresh_entities = [hub.get_sensor_by_name(key) for key in REFRESH_KEYS]
+    write_infos = [hub.get_entity_info(key) for key in WRITE_KEYS]
+
+    async def run_once(index):
+        if operation == "poll":
+            await hub.async_refresh_modbus_data()
+        elif operation == "refresh":
+            await hub.async_request_refresh(refresh_entities)
+        else:
+            values = {(info.slave, info.address): 20 + index % 2 for info in write_infos}
+            await hub.async_write_register_values(values)
+            if hub._unsub_followup is not None:
+                hub._unsub_followup()
+                hub._unsub_followup = None
+
+    #connect and warm up
+    await run_once(0)
+    samples = []
+    for index in range(operations):
+        executor_time, decode_time = hass.executor_time, decode_timer.time
+        updates = sum(entity.updates for entity in entities)
+        requests = controller.requests
+        start = time.perf_counter()
+        await run_once(index + 1)
+        wall = time.perf_counter() - start
+        executor = hass.executor_time - executor_time
+        samples.append({
+            "transactions": controller.requests - requests,
+            "wall": wall,
+            "executor": executor,
+            "decode": decode_timer.time - decode_time,
+            "loop": max(wall - executor, 0),
+            "fanout": sum(entity.updates for entity in entities) - updates,
+        })
+    hub.close()
+    return samples
+
+
+def _summary(samples):
+    walls = sorted(sample["wall"] for sample in samples)
+    return {
+        "transactions": round(statistics.mean(sample["transactions"] for sample in samples), 2),
+        "p50_ms": round(statistics.median(walls) * 1000, 3),
+        "p95_ms": round(walls[min(len(walls) - 1, int(len(walls) * 0.95))] * 1000, 3),
+        "executor_ms": round(statistics.mean(sample["executor"] for sample in samples) * 1000, 3),
+        "decode_ms": round(statistics.mean(sample["decode"] for sample in samples) * 1000, 3),
+        "loop_ms": round(statistics.mean(sample["loop"] for sample in samples) * 1000, 3),
+        "fanout": round(statistics.mean(sample["fanout"] for sample in samples), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rtt", type=float, default=5, help="response time of the simulated controller in ms")
+    parser.add_argument("--cycles", type=int, default=50, help="operations per scenario")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--port", type=int, default=5120)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p95 growth over the baseline")
+    parser.add_argument("--transaction-tolerance", type=float, default=0.05, help="allowed growth of the transactions, statuses of the simulator change at random")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    profile = compile_profile(select_profile(load_profiles(), None))
+    results = {}
+    with tempfile.TemporaryDirectory() as config_dir:
+        for index, name in enumerate(args.scenarios):
+            operation, options = SCENARIOS[name]
+            port = args.port + index
+            loop, simulator = _start_simulator(port, args.rtt, options)
+            samples = asyncio.run(_run_scenario(operation, port, profile, args.cycles, config_dir, simulator["controller"]))
+            asyncio.run_coroutine_threadsafe(async_stop_simulator(simulator["server"], simulator["task"]), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            results[name] = _summary(samples)
+            result = results[name]
+            print(f"{name:14s} {result['transactions']:6.2f} transactions, wall p50 {result['p50_ms']:8.2f} ms "
+                  f"p95 {result['p95_ms']:8.2f} ms, executor {result['executor_ms']:8.2f} ms, "
+                  f"decode {result['decode_ms']:6.3f} ms, loop {result['loop_ms']:6.3f} ms, fan-out {result['fanout']:.0f}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"rtt_ms": args.rtt, "scenarios": results}, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline, run with --update-baseline first")
+        return
+    with open(args.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline["rtt_ms"] != args.rtt:
+        print(f"Baseline was taken with --rtt {baseline['rtt_ms']}, not compared")
+        return
+    failed = False
+    for name, result in results.items():
+        expected = baseline["scenarios"].get(name)
+        if expected is None:
+            continue
+        if result["transactions"] > expected["transactions"] * (1 + args.transaction_tolerance):
+            print(f"  {name}: {result['transactions']} transactions, baseline {expected['transactions']}")
+            failed = True
+        if result["p95_ms"] > expected["p95_ms"] * (1 + args.tolerance):
+            print(f"  {name}: p95 {result['p95_ms']} ms, baseline {expected['p95_ms']} ms")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Poll generated register maps with a growing number of heat circuits against a stand-in device.
+
+The heat circuit template is moved behind the fixed registers and repeated
+--circuits times, the hub plans and polls the whole map from an in-memory
+register image. Exits with 1 if a circuit is not decoded or the block count
+grows beyond what the register span needs.
+
+Run from the repository root with Home Assistant and pymodbus installed:
+
+    python benchmarks/register_map_scaling.py --circuits 3 10 30
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymodbus.pdu.register_message import ReadHoldingRegistersResponse  # noqa: E402
+
+from custom_components.home_heat_control.const import MODBUS_MAX_READ_COUNT  # noqa: E402
+from custom_components.home_heat_control.homeheatcontrol import HomeHeatControl  # noqa: E402
+from custom_components.home_heat_control.profiles import compile_profile  # noqa: E402
+
+PLATFORMS = ["sensor", "binary_sensor", "switch", "button", "number", "time", "select"]
+HEATCIRCUIT_BASE = 300
+HEATCIRCUIT_STRIDE = 20
+
+
+class _StandInDevice:
+    """Answers every read from a register image, 1 = active for all status registers."""
+
+    def __init__(self):
+        self.transactions = 0
+
+    def read_holding_registers(self, address, count, slave):
+        self.transactions += 1
+        return ReadHoldingRegistersResponse(registers=[1] * count)
+
+    def connect(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class _Entity:
+    def __init__(self, entity_info):
+        self._slaveId = entity_info.slave
+        self._address = entity_info.address
+        self.entity_description = entity_info.description
+        self._data = None
+
+
+def _poll(circuits, cycles):
+    profile = compile_profile({
+        "id": f"hc{circuits}",
+        "templates": {"heatcircuit": {"base": HEATCIRCUIT_BASE, "stride": HEATCIRCUIT_STRIDE, "count": circuits}},
+        "registers": {},
+    })
+    hub = HomeHeatControl(None, f"hc{circuits}", "localhost", 502, 0, 5, profile)
+    device = _StandInDevice()
+    hub._client = device
+    for platform in PLATFORMS:
+        for entity_info in hub.get_platform_entities(platform):
+            hub._sensors.append(_Entity(entity_info))
+
+    start = time.perf_counter()
+    hub._build_read_plan()
+    plan_time = time.perf_counter() - start
+
+    device.transactions = 0
+    start = time.perf_counter()
+    for _cycle in range(cycles):
+        hub.read_modbus_data()
+    cycle_time = (time.perf_counter() - start) / cycles
+
+    missing = [
+        n for n in range(1, circuits + 1)
+        if hub.get_sensor_by_name(f"heatcircuit_{n}_status") is None
+        or hub.get_sensor_by_name(f"heatcircuit_{n}_status")._data is None
+    ]
+    circuit_blocks = math.ceil(circuits * HEATCIRCUIT_STRIDE / MODBUS_MAX_READ_COUNT)
+    return {
+        "entities": len(hub._sensors),
+        "blocks": len(hub._read_plan),
+        "transactions": device.transactions / cycles,
+        "plan_ms": plan_time * 1000,
+        "cycle_ms": cycle_time * 1000,
+        "missing": missing,
+        "block_budget": circuit_blocks + 2,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--circuits", type=int, nargs="+", default=[3, 10, 30])
+    parser.add_argument("--cycles", type=int, default=100)
+    args = parser.parse_args()
+
+    failed = False
+    for circuits in args.circuits:
+        result = _poll(circuits, args.cycles)
+        print(f"{circuits:3d} circuits: {result['entities']} entities, {result['blocks']} blocks, "
+              f"{result['transactions']:.1f} transactions/cycle, plan {result['plan_ms']:.2f} ms, "
+              f"cycle {result['cycle_ms']:.3f} ms")
+        if result["missing"]:
+            print(f"  heat circuits not decoded: {result['missing']}")
+            failed = True
+        if result["blocks"] > result["block_budget"]:
+            print(f"  {result['blocks']} blocks, expected at most {result['block_budget']}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,14 @@
 """The HHC Modbus Integration."""
 import logging
+from datetime import datetime
 
 import voluptuous as vol
 
 import homeassistant.helpers.config_validation as cv
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_NAME, CONF_HOST, CONF_PORT, CONF_SCAN_INTERVAL
+from homeassistant.const import CONF_NAME, CONF_HOST, CONF_PORT, CONF_SCAN_INTERVAL, EVENT_HOMEASSISTANT_STOP
 from homeassistant.core import HomeAssistant
-
-from .homeheatcontrol import HomeHeatControl
+from homeassistant.util import slugify
 
 from .const import (
     DOMAIN,
@@ -16,7 +16,14 @@ from .const import (
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_MODBUS_ADDRESS,
     CONF_MODBUS_ADDRESS,
+    CONF_INSTALLED_SUBSYSTEMS,
+    CONF_APPL_SW_VERSION,
+    CONF_RECORD_TRACE,
+    CONF_TRANSACTION_SPANS,
+    CONF_DELTA_EVENT,
+    TRACE_DIRECTORY,
 )
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,6 +47,10 @@ PLATFORMS = ["sensor", "binary_sensor", "switch", "button", "number", "time", "s
 async def async_setup(hass, config):
     """Set up the HHC modbus component."""
     hass.data[DOMAIN] = {}
+    await async_setup_services(hass)
+    #aiohttp and the http component are only imported once the integration is set up
+    from .metrics import HomeHeatControlMetricsView
+    hass.http.register_view(HomeHeatControlMetricsView(hass))
     return True
 
 
@@ -50,29 +61,72 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     port = entry.data[CONF_PORT]
     address = entry.data.get(CONF_MODBUS_ADDRESS, 1)
     scan_interval = entry.data[CONF_SCAN_INTERVAL]
+    installed_subsystems = entry.data.get(CONF_INSTALLED_SUBSYSTEMS)
+    appl_sw_version = entry.data.get(CONF_APPL_SW_VERSION)
+    trace_path = None
+    if entry.options.get(CONF_RECORD_TRACE):
+        #pdu_trace.py replays the file
+        from .pdu_trace import TRACE_FILE_SUFFIX
+        trace_path = hass.config.path(TRACE_DIRECTORY, f"{slugify(name)}_{datetime.now():%Y%m%d-%H%M%S}{TRACE_FILE_SUFFIX}")
 
     _LOGGER.debug("Setup %s.%s", DOMAIN, name)
 
+    #pymodbus is only imported once there is an entry to set up
+    from .homeheatcontrol import HomeHeatControl
+    from .profiles import async_get_register_profile, select_profile_id
+
+    profile = await async_get_register_profile(hass, appl_sw_version)
+
+    async def async_firmware_changed(new_appl_sw_version):
+        """Reload with the register profile of a new firmware."""
+        profile_id = await hass.async_add_executor_job(select_profile_id, new_appl_sw_version)
+        if profile_id != profile["id"]:
+            _LOGGER.info(f"Firmware {new_appl_sw_version} uses register profile {profile_id}, reloading")
+            #the update listener reloads the entry
+            hass.config_entries.async_update_entry(
+                entry, data={**entry.data, CONF_APPL_SW_VERSION: new_appl_sw_version}
+            )
+
     hub = HomeHeatControl(
         hass,
         name,
         host,
         port,
         address,
-        scan_interval
+        scan_interval,
+        profile,
+        installed_subsystems,
+        appl_sw_version,
+        async_firmware_changed,
+        trace_path,
+        entry.options.get(CONF_TRANSACTION_SPANS, 0),
+        entry.options.get(CONF_DELTA_EVENT, False),
     )
+    await hub.async_load_register_map()
+    await hub.async_load_snapshot()
     """Register the hub."""
     hass.data[DOMAIN][name] = {"hub": hub}
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, hub.async_save_snapshot))
+
+    #first refresh right away instead of one scan interval later
+    hass.async_create_task(hub.async_refresh_modbus_data())
     return True
 
 
+async def async_reload_entry(hass, entry):
+    """Reload HHC modbus entry after a hardware rescan or an options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass, entry):
     """Unload HHC mobus entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if not unload_ok:
         return False
 
-    hass.data[DOMAIN].pop(entry.data["name"])
+    hub = hass.data[DOMAIN].pop(entry.data["name"])["hub"]
+    await hub.async_save_snapshot()
     return True
\ No newline at end of file
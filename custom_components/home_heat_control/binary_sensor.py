@@ -1,7 +1,6 @@
 import logging
 from typing import Optional, Dict, Any
 from .const import (
-    HHCSENSOR_TYPES,
     DOMAIN,
     ATTR_MANUFACTURER,
 )
@@ -32,19 +31,16 @@ async def async_setup_entry(hass, entry, async_add_entities):
     }
 
     entities = []
-    for sensor_info in HHCSENSOR_TYPES:
-        sensorType = str(type(sensor_info[2])).split(".")[-1].split("'")[0]
-        sensorTypeCompare = str(BinarySensorEntityDescription).split(".")[-1].split("'")[0]
-        if (sensorType == sensorTypeCompare):
-            sensor = HHCBinarySensor(
-                conf_name,
-                hub,
-                device_info,
-                sensor_info[0],     #slave ID
-                sensor_info[1],     #modbus address
-                sensor_info[2],     #sensor description
-            )
-            entities.append(sensor)
+    for entity_info in hub.get_platform_entities("binary_sensor"):
+        sensor = HHCBinarySensor(
+            conf_name,
+            hub,
+            device_info,
+            entity_info.slave,
+            entity_info.address,
+            entity_info.description,
+        )
+        entities.append(sensor)
 
     async_add_entities(entities)
     return True
@@ -61,6 +57,7 @@ class HHCBinarySensor(BinarySensorEntity):
         self._slaveId = slaveId
         self._address = address
         self._data = None
+        self._active_dtcs = None
 
     async def async_added_to_hass(self):
         """Register callbacks."""
@@ -72,6 +69,10 @@ class HHCBinarySensor(BinarySensorEntity):
     def _modbus_data_updated(self):
         self.async_write_ha_state()
 
+    async def async_update(self) -> None:
+        """Read the registers of this entity right away, used by homeassistant.update_entity."""
+        await self._hub.async_request_refresh([self])
+
     @property
     def should_poll(self) -> bool:
         """Data is delivered by the hub"""
@@ -95,4 +96,13 @@ class HHCBinarySensor(BinarySensorEntity):
         if self._attr_is_on:
             return STATE_ON
         else:
-            return STATE_OFF
\ No newline at end of file
+            return STATE_OFF
+
+    @property
+    def extra_state_attributes(self) -> Optional[Dict[str, Any]]:
+        """Return the active DTC numbers of the DTC sensor."""
+        if self._active_dtcs is None:
+            return None
+        if not self._data:
+            return {"active_dtcs": []}
+        return {"active_dtcs": self._active_dtcs}
@@ -1,7 +1,6 @@
 import logging
 from typing import Optional, Dict, Any
 from .const import (
-    HHCSENSOR_TYPES,
     DOMAIN,
     ATTR_MANUFACTURER,
 )
@@ -9,9 +8,6 @@ from homeassistant.const import (
     CONF_NAME,
 )
 
-from pymodbus.constants import Endian
-from pymodbus.payload import BinaryPayloadBuilder
-
 from homeassistant.components.button import (
     ButtonEntity,
     ButtonEntityDescription
@@ -31,20 +27,17 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
     }
 
     entities = []
-    for sensor_info in HHCSENSOR_TYPES:
-        sensorType = str(type(sensor_info[2])).split(".")[-1].split("'")[0]
-        sensorTypeCompare = str(ButtonEntityDescription).split(".")[-1].split("'")[0]
-        if (sensorType == sensorTypeCompare):
-            sensor = HHCButton(
-                conf_name,
-                hub,
-                device_info,
-                sensor_info[0],     #slave ID
-                sensor_info[1],     #modbus address
-                sensor_info[2],     #sensor description
-                sensor_info[3],     #pressed value
-            )
-            entities.append(sensor)
+    for entity_info in hub.get_platform_entities("button"):
+        sensor = HHCButton(
+            conf_name,
+            hub,
+            device_info,
+            entity_info.slave,
+            entity_info.address,
+            entity_info.description,
+            entity_info.parameter,
+        )
+        entities.append(sensor)
 
     async_add_entities(entities)
     return True
@@ -84,12 +77,12 @@ class HHCButton(ButtonEntity):
 
     async def async_press(self) -> None:
         """Press the button."""
-        builder = BinaryPayloadBuilder(byteorder=Endian.BIG, wordorder=Endian.LITTLE)
-        builder.add_16bit_uint(int(self._pressed_value))
+        payload = [int(self._pressed_value)]
         
-        _LOGGER.debug(f"try to write: Value:{builder.to_registers()}, Name:{self.entity_description.key}, Address:{self._address}")
+        _LOGGER.debug(f"try to write: Value:{payload}, Name:{self.entity_description.key}, Address:{self._address}")
           
-        response = self._hub.write_registers(unit=self._slaveId, address=self._address, payload=builder.to_registers())
-        if response.isError():
-            _LOGGER.error(f"Could not write: Value:{builder.to_registers()}, Name:{self.entity_description.key}, Address:{self._address}")
+        #the hub reads the registers depending on this button shortly after the write
+        registers = await self._hub.async_write_registers(self._slaveId, self._address, payload)
+        if registers is None:
+            _LOGGER.error(f"Could not write: Value:{payload}, Name:{self.entity_description.key}, Address:{self._address}")
             return
@@ -0,0 +1,156 @@
+"""Poll a controller with the hub's read plan and codecs, without Home Assistant.
+
+    python -m custom_components.home_heat_control.cli 192.168.1.50 --interval 5
+    python -m custom_components.home_heat_control.cli 127.0.0.1 --port 5020 --json --cycles 100
+    python -m custom_components.home_heat_control.cli 127.0.0.1 --port 5020 --interval 0 --cycles 500 --profile poll.pstats
+
+Prints the decoded values of every cycle, all values as one JSON line per
+cycle with --json, and a summary of cycle times, transactions and
+throughput at the end. --interval 0 polls as fast as the controller answers.
+"""
+import argparse
+import cProfile
+import json
+import logging
+import pstats
+import statistics
+import sys
+import time
+
+from .const import DEFAULT_PORT, DEFAULT_MODBUS_ADDRESS, PROFILE_TOP_FUNCTIONS
+from .homeheatcontrol import HomeHeatControl, probe_controller
+from .profiles import compile_profile, load_profiles, select_profile
+
+_LOGGER = logging.getLogger(__name__)
+
+PLATFORMS = ["sensor", "binary_sensor", "switch", "number", "time", "select"]
+
+
+class _Entity:
+    """Holds the decoded value of one register like the platform entities"""
+
+    def __init__(self, entity_info):
+        self._slaveId = entity_info.slave
+        self._address = entity_info.address
+        self.entity_description = entity_info.description
+        self._data = None
+
+
+def _values(entities):
+    values = {}
+    for entity in entities:
+        values[entity.entity_description.key] = entity._data
+        active_dtcs = getattr(entity, "_active_dtcs", None)
+        if active_dtcs is not None:
+            values["active_dtcs"] = active_dtcs
+    return values
+
+
+def create_hub(host, port, unit=DEFAULT_MODBUS_ADDRESS, interval=5, probe=True, trace_path=None):
+    """Return a hub without hass and the entities it polls, with the installed subsystems and register profile of the controller."""
+    discovery = probe_controller(host, port) if probe else None
+    if probe and discovery is None:
+        raise ConnectionError(f"Controller {host}:{port} can't be reached")
+    discovery = discovery or {}
+    profile = compile_profile(select_profile(load_profiles(), discovery.get("appl_sw_version")))
+    hub = HomeHeatControl(
+        None,
+        "cli",
+        host,
+        port,
+        unit,
+        max(int(interval), 1),
+        profile,
+        discovery.get("installed_subsystems"),
+        discovery.get("appl_sw_version"),
+        trace_path=trace_path,
+    )
+    entities = [_Entity(entity_info) for platform in PLATFORMS for entity_info in hub.get_platform_entities(platform)]
+    hub._sensors.extend(entities)
+    return hub, entities
+
+
+def poll(hub, entities, interval, cycles, output_json, output=sys.stdout):
+    """Poll until cycles are done or Ctrl+C, returns the cycle times and the number of transactions."""
+    transactions = 0
+    read_holding_registers = hub.read_holding_registers
+
+    def counted_read(unit, address, count):
+        nonlocal transactions
+        transactions += 1
+        return read_holding_registers(unit, address, count)
+
+    hub.read_holding_registers = counted_read
+    durations = []
+    last = {}
+    next_cycle = time.monotonic()
+    try:
+        while cycles is None or len(durations) < cycles:
+            start = time.perf_counter()
+            if hub._check_and_reconnect():
+                hub.read_modbus_data()
+            durations.append(time.perf_counter() - start)
+            values = _values(entities)
+            if output_json:
+                output.write(json.dumps({"time": time.time(), "duration_ms": round(durations[-1] * 1000, 3), "values": values}, default=str) + "\n")
+            else:
+                output.write(f"cycle {len(durations)}: {durations[-1] * 1000:.1f} ms\n")
+                for key, value in values.items():
+                    if last.get(key, ()) != value:
+                        output.write(f"  {key}: {value}\n")
+            output.flush()
+            last = values
+            next_cycle += interval
+            time.sleep(max(next_cycle - time.monotonic(), 0))
+    except KeyboardInterrupt:
+        pass
+    return durations, transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("host")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unit", type=int, default=DEFAULT_MODBUS_ADDRESS, help="modbus address")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between the cycle starts, 0 polls back to back")
+    parser.add_argument("--cycles", type=int, help="stop after this many cycles")
+    parser.add_argument("--json", action="store_true", help="one JSON line with all values per cycle")
+    parser.add_argument("--no-probe", action="store_true", help="poll the base profile with all subsystems instead of probing the controller")
+    parser.add_argument("--trace", help="record the PDUs to this file, see pdu_trace.py")
+    parser.add_argument("--profile", help="run under cProfile and save the stats to this file")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    #the values go to stdout, logs and the summary to stderr
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, stream=sys.stderr)
+
+    try:
+        hub, entities = create_hub(args.host, args.port, args.unit, args.interval, not args.no_probe, args.trace)
+    except ConnectionError as error:
+        sys.exit(str(error))
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    start = time.perf_counter()
+    durations, transactions = poll(hub, entities, args.interval, args.cycles, args.json)
+    elapsed = time.perf_counter() - start
+    if profiler is not None:
+        profiler.disable()
+    hub.close()
+
+    if durations:
+        ordered = sorted(durations)
+        print(
+            f"{len(durations)} cycles in {elapsed:.1f} s ({len(durations) / elapsed:.2f} cycles/s), "
+            f"{transactions / len(durations):.1f} transactions/cycle, "
+            f"cycle mean {statistics.mean(durations) * 1000:.1f} ms p95 {ordered[int(len(ordered) * 0.95)] * 1000:.1f} ms "
+            f"max {ordered[-1] * 1000:.1f} ms",
+            file=sys.stderr,
+        )
+    if profiler is not None:
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import ipaddress
+import logging
 import re
 
 import voluptuous as vol
@@ -11,10 +12,27 @@ from .const import (
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_PORT,
     DEFAULT_MODBUS_ADDRESS,
-    CONF_MODBUS_ADDRESS
+    CONF_MODBUS_ADDRESS,
+    CONF_APPL_SW_VERSION,
+    CONF_RESCAN,
+    CONF_RECORD_TRACE,
+    CONF_TRANSACTION_SPANS,
+    CONF_DELTA_EVENT,
 )
 from homeassistant.core import HomeAssistant, callback
 
+_LOGGER = logging.getLogger(__name__)
+
+def options_schema(options):
+    return vol.Schema(
+        {
+            vol.Optional(CONF_RESCAN, default=True): bool,
+            vol.Optional(CONF_RECORD_TRACE, default=options.get(CONF_RECORD_TRACE, False)): bool,
+            vol.Optional(CONF_TRANSACTION_SPANS, default=options.get(CONF_TRANSACTION_SPANS, 0)): vol.All(vol.Coerce(int), vol.Range(min=0, max=10000)),
+            vol.Optional(CONF_DELTA_EVENT, default=options.get(CONF_DELTA_EVENT, False)): bool,
+        }
+    )
+
 DATA_SCHEMA = vol.Schema(
     {
         vol.Optional(CONF_NAME, default=DEFAULT_NAME): str,
@@ -50,6 +68,12 @@ class HomeHeatControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return HomeHeatControlOptionsFlow()
+
     def _host_in_configuration_exists(self, host) -> bool:
         """Return True if host exists in configuration."""
         if host in hhc_master_entries(self.hass):
@@ -70,6 +94,14 @@ class HomeHeatControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 await self.async_set_unique_id(user_input[CONF_HOST])
                 self._abort_if_unique_id_configured()
+                from .homeheatcontrol import probe_controller
+                probe = await self.hass.async_add_executor_job(
+                    probe_controller, host, user_input[CONF_PORT]
+                )
+                if probe is not None:
+                    user_input.update(probe)
+                else:
+                    _LOGGER.warning("hardware discovery failed, all subsystems are set up, use the rescan option later")
                 return self.async_create_entry(
                     title=user_input[CONF_NAME], data=user_input
                 )
@@ -78,3 +110,37 @@ class HomeHeatControlConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=DATA_SCHEMA, errors=errors
         )
 
+
+class HomeHeatControlOptionsFlow(config_entries.OptionsFlow):
+    """HHC options flow to rescan the installed hardware, record the Modbus traffic and transactions and fire delta events."""
+
+    async def async_step_init(self, user_input=None):
+        """Handle the rescan step."""
+        errors = {}
+
+        if user_input is not None:
+            options = {key: value for key, value in user_input.items() if key != CONF_RESCAN}
+            if not user_input[CONF_RESCAN]:
+                return self.async_create_entry(title="", data=options)
+
+            from .homeheatcontrol import probe_controller
+            probe = await self.hass.async_add_executor_job(
+                probe_controller,
+                self.config_entry.data[CONF_HOST],
+                self.config_entry.data[CONF_PORT],
+            )
+            if probe is None:
+                errors["base"] = "cannot_connect"
+            else:
+                #data and options in one update, so the update listener reloads the entry only once
+                #with the new entity set and register profile, the unchanged options below do not reload again
+                self.hass.config_entries.async_update_entry(
+                    self.config_entry,
+                    data={**self.config_entry.data, **probe},
+                    options=options,
+                )
+                return self.async_create_entry(title="", data=options)
+
+        return self.async_show_form(
+            step_id="init", data_schema=options_schema(self.config_entry.options), errors=errors
+        )
@@ -1,11 +1,6 @@
-from homeassistant.components.sensor import SensorEntityDescription, SensorStateClass
-from homeassistant.components.sensor.const import SensorDeviceClass
-from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntityDescription
-from homeassistant.components.switch import SwitchDeviceClass, SwitchEntityDescription
-from homeassistant.components.button import ButtonEntityDescription
-from homeassistant.components.number import NumberEntityDescription, NumberMode
-from homeassistant.components.time import TimeEntityDescription
-from homeassistant.components.select import SelectEntityDescription
+import functools
+from typing import Any, NamedTuple
+
 from homeassistant.const import (
     UnitOfTemperature,
     PERCENTAGE
@@ -17,134 +12,370 @@ DEFAULT_SCAN_INTERVAL = 5
 DEFAULT_PORT = 502
 DEFAULT_MODBUS_ADDRESS = 0
 DEFAULT_MODBUS_TIMEOUT = 30
+#socket timeout and retries of the hardware discovery, a silent gateway must not block the config flow
+PROBE_TIMEOUT = 3
+PROBE_RETRIES = 1
 
 ATTR_MANUFACTURER = "MM/HL Engineering"
 CONF_MODBUS_ADDRESS = "modbus_address"
+CONF_INSTALLED_SUBSYSTEMS = "installed_subsystems"
+CONF_RESCAN = "rescan"
+CONF_APPL_SW_VERSION = "appl_sw_version"
+CONF_RECORD_TRACE = "record_trace"
+CONF_TRANSACTION_SPANS = "transaction_spans"
+CONF_DELTA_EVENT = "delta_event"
+
+MODBUS_MAX_READ_COUNT = 125
+#read/write multiple registers (FC23) takes at most 121 registers, write multiple (FC16) 123
+MODBUS_MAX_WRITE_COUNT = 121
+
+STORAGE_VERSION = 1
+REGISTER_MAP_SAVE_DELAY = 10
+SNAPSHOT_SAVE_INTERVAL = 300
+SNAPSHOT_MAX_AGE = 86400
+
+#codec: raw value of its registers without hardware behind them ("Nicht verbaut")
+#only codecs decoding the value as a state, 0xFFFE is a valid int16 or temperature reading
+SENTINEL_VALUES = {"temperature": 0x7FFD, "filllevel": 0xFFFE}
+SENTINEL_PRUNE_CYCLES = 10
+PRUNED_REVALIDATE_INTERVAL = 3600
+WRITE_FOLLOWUP_DELAY = 1
+#poll cycles kept for the diagnostics download
+DIAGNOSTICS_CYCLES = 20
+#directory in the HA config dir for the pstats files of the profile service
+PROFILE_DIRECTORY = "home_heat_control_profiles"
+PROFILE_TOP_FUNCTIONS = 25
+#fired once per cycle with the changed registers and entity values if the delta_event option is set
+DELTA_EVENT = "home_heat_control_delta"
+#directory in the HA config dir for the PDU traces of the record_trace option
+TRACE_DIRECTORY = "home_heat_control_traces"
+
+#DTC status words, one bit per DTC, polled if the register profile documents their range
+DTC_STATUS_KEY = "dtc_status"
+
+#subsystem id (also the key prefix of its entities): [status key, raw value reported if not installed]
+HHC_SUBSYSTEMS = {
+    "bufferstorage": ["bufferstorage_status", 0],
+    "bufferstorage_2": ["bufferstorage_2_filllevel", 0xFFFE],
+    "warmwater_boiler": ["warmwater_boiler_status", 0],
+    "warmwater_circulation_circuit1": ["warmwater_circulation_circuit1_status", 0],
+    "warmwater_circulation_circuit2": ["warmwater_circulation_circuit2_status", 0],
+    "woodburner": ["woodburner_status", 0],
+    "gasburner": ["gasburner_status", 0],
+}
+
+#register map templates: address of the first instance, registers per instance and number of instances
+#a register profile may override them, a larger count needs a base behind the fixed registers
+HHC_TEMPLATES = {
+    "heatcircuit": {"base": 40, "stride": 20, "count": 3},
+    "bufferstorage_temperature": {"base": 101, "stride": 4, "count": 2},
+    "bufferstorage_filllevel": {"base": 114, "stride": 1, "count": 2},
+}
+
+def template_layout(overrides=None):
+    """Return the (template, base, stride, count) tuples of HHC_TEMPLATES with the overrides of a register profile."""
+    overrides = overrides or {}
+    return tuple(
+        (name, *(overrides.get(name, {}).get(field, template[field]) for field in ("base", "stride", "count")))
+        for name, template in HHC_TEMPLATES.items()
+    )
+
+def template_instances(layout, name):
+    """Return (instance number, first address) of all instances of a template, numbered from 1."""
+    for template, base, stride, count in layout:
+        if template == name:
+            return [(index + 1, base + index * stride) for index in range(count)]
+    return []
+
+DEFAULT_LAYOUT = template_layout()
+
+
+class HHCEntityInfo(NamedTuple):
+    """One row of HHCSENSOR_TYPES."""
+
+    slave: int
+    address: int
+    description: Any
+    parameter: Any = None   #modbus scaling factor of numbers, pressed value of buttons
+
+@functools.cache
+def get_sensor_types(layout=DEFAULT_LAYOUT):
+    """Build the register map (HHCSENSOR_TYPES) on first use, the entity component imports are deferred until then."""
+    from homeassistant.components.sensor import SensorEntityDescription, SensorStateClass
+    from homeassistant.components.sensor.const import SensorDeviceClass
+    from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntityDescription
+    from homeassistant.components.switch import SwitchDeviceClass, SwitchEntityDescription
+    from homeassistant.components.button import ButtonEntityDescription
+    from homeassistant.components.number import NumberEntityDescription, NumberMode
+    from homeassistant.components.time import TimeEntityDescription
+    from homeassistant.components.select import SelectEntityDescription
+
+    sensor_types = [
+        #General
+        [DEFAULT_MODBUS_ADDRESS, 0, SensorEntityDescription(name="FBL Software Version", key="fbl_sw_version", icon="mdi:chip")],
+        [DEFAULT_MODBUS_ADDRESS, 1, SensorEntityDescription(name="APPL Software Version", key="appl_sw_version", icon="mdi:chip")],
+        [DEFAULT_MODBUS_ADDRESS, 3, BinarySensorEntityDescription(name="DTCs Aktiv", key="dtcactive", device_class=BinarySensorDeviceClass.PROBLEM)],
+        [DEFAULT_MODBUS_ADDRESS, 4, ButtonEntityDescription(name="DTCs Löschen", key="dtcclear", icon="mdi:notification-clear-all"), 1],
+        #General Temperatures
+        [DEFAULT_MODBUS_ADDRESS, 20, SensorEntityDescription(name="Außentemperatur", key="outsidetemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+        [DEFAULT_MODBUS_ADDRESS, 21, SensorEntityDescription(name="Raum 1 Temperatur", key="room1temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+        [DEFAULT_MODBUS_ADDRESS, 22, SensorEntityDescription(name="Raum 2 Temperatur", key="room2temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+        #Doorbell
+        [DEFAULT_MODBUS_ADDRESS, 25, SensorEntityDescription(name="Türklingel Status", key="doorbell_status", device_class=SensorDeviceClass.ENUM, icon="mdi:bell")],
+        #Heat control management
+        [DEFAULT_MODBUS_ADDRESS, 30, SwitchEntityDescription(name="Hauptschalter", key="heatcontrolmanagement_enabled", device_class=SwitchDeviceClass.SWITCH)],
+        [DEFAULT_MODBUS_ADDRESS, 31, BinarySensorEntityDescription(name="Temperatur niedrig Warnung", key="heatcontrolmanagement_lowTemperatureWarning", device_class=BinarySensorDeviceClass.COLD)],
+    ]
+    #heat circuits, HC1 40-59, HC2 60-79 and HC3 80-99 on the standard controller
+    for n, address in template_instances(layout, "heatcircuit"):
+        sensor_types += [
+            [DEFAULT_MODBUS_ADDRESS, address, SensorEntityDescription(name=f"HK{n} Status", key=f"heatcircuit_{n}_status", device_class=SensorDeviceClass.ENUM)],
+            [DEFAULT_MODBUS_ADDRESS, address + 1, SensorEntityDescription(name=f"HK{n} Pumpenstatus", key=f"heatcircuit_{n}_pumpstatus", device_class=SensorDeviceClass.ENUM)],
+            [DEFAULT_MODBUS_ADDRESS, address + 2, SensorEntityDescription(name=f"HK{n} Mischerstatus", key=f"heatcircuit_{n}_mixerstatus", device_class=SensorDeviceClass.ENUM)],
+            [DEFAULT_MODBUS_ADDRESS, address + 3, BinarySensorEntityDescription(name=f"HK{n} Mischer normiert", key=f"heatcircuit_{n}_mixernormed")],
+            [DEFAULT_MODBUS_ADDRESS, address + 4, SensorEntityDescription(name=f"HK{n} Mischer Position", key=f"heatcircuit_{n}_mixerposition", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=PERCENTAGE)],
+            [DEFAULT_MODBUS_ADDRESS, address + 5, SensorEntityDescription(name=f"HK{n} Zielvorlauftemperatur", key=f"heatcircuit_{n}_targetForerunTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+            [DEFAULT_MODBUS_ADDRESS, address + 6, SensorEntityDescription(name=f"HK{n} Vorlauftemperatur", key=f"heatcircuit_{n}_forerunTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+            [DEFAULT_MODBUS_ADDRESS, address + 7, SensorEntityDescription(name=f"HK{n} Rücklauftemperatur", key=f"heatcircuit_{n}_returnflowTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+            [DEFAULT_MODBUS_ADDRESS, address + 9, SelectEntityDescription(name=f"HK{n} Modus überschreiben", key=f"heatcircuit_{n}_mode_overwrite", options=["Keine Anforderung", "Heizung AUS", "Nachtabsenkung", "Tagbetrieb"], icon="mdi:cogs")],
+            [DEFAULT_MODBUS_ADDRESS, address + 10, SelectEntityDescription(name=f"HK{n} Timer 1 Modus", key=f"heatcircuit_{n}_timer_1_mode", options=["Nicht benutzt", "Heizung AUS", "Nachtabsenkung"], icon="mdi:timer-cog")],
+            [DEFAULT_MODBUS_ADDRESS, address + 11, TimeEntityDescription(name=f"HK{n} Timer 1 Start", key=f"heatcircuit_{n}_timer_1_start", icon="mdi:timer")],
+            [DEFAULT_MODBUS_ADDRESS, address + 12, TimeEntityDescription(name=f"HK{n} Timer 1 Stop", key=f"heatcircuit_{n}_timer_1_stop", icon="mdi:timer-off")],
+            [DEFAULT_MODBUS_ADDRESS, address + 13, SelectEntityDescription(name=f"HK{n} Timer 2 Modus", key=f"heatcircuit_{n}_timer_2_mode", options=["Nicht benutzt", "Heizung AUS", "Nachtabsenkung"], icon="mdi:timer-cog")],
+            [DEFAULT_MODBUS_ADDRESS, address + 14, TimeEntityDescription(name=f"HK{n} Timer 2 Start", key=f"heatcircuit_{n}_timer_2_start", icon="mdi:timer")],
+            [DEFAULT_MODBUS_ADDRESS, address + 15, TimeEntityDescription(name=f"HK{n} Timer 2 Stop", key=f"heatcircuit_{n}_timer_2_stop", icon="mdi:timer-off")],
+            [DEFAULT_MODBUS_ADDRESS, address + 16, NumberEntityDescription(name=f"HK{n} Kurve Neigung", key=f"heatcircuit_{n}_curve_inclination", mode=NumberMode.BOX, native_min_value=0.2, native_max_value=3.5, native_step=0.1, icon="mdi:home-thermometer"), 0.1],
+            [DEFAULT_MODBUS_ADDRESS, address + 17, NumberEntityDescription(name=f"HK{n} Kurve Niveau", key=f"heatcircuit_{n}_curve_niveau", unit_of_measurement=UnitOfTemperature.KELVIN, mode=NumberMode.BOX, native_min_value=-30, native_max_value=30, native_step=1, icon="mdi:home-thermometer"), 1],
+            [DEFAULT_MODBUS_ADDRESS, address + 18, NumberEntityDescription(name=f"HK{n} Kurve Zieltemperatur Tag", key=f"heatcircuit_{n}_curve_targettemperature_day", unit_of_measurement=UnitOfTemperature.CELSIUS, mode=NumberMode.BOX, native_min_value=0, native_max_value=40, native_step=1, icon="mdi:sun-thermometer"), 1],
+            [DEFAULT_MODBUS_ADDRESS, address + 19, NumberEntityDescription(name=f"HK{n} Kurve Zieltemperatur Nacht", key=f"heatcircuit_{n}_curve_targettemperature_night", unit_of_measurement=UnitOfTemperature.CELSIUS, mode=NumberMode.BOX, native_min_value=0, native_max_value=40, native_step=1, icon="mdi:snowflake-thermometer"), 1],
+        ]
+    sensor_types += [
+        #Bufferstorage
+        [DEFAULT_MODBUS_ADDRESS, 100, SensorEntityDescription(name="Pufferspeicher Status", key="bufferstorage_status", device_class=SensorDeviceClass.ENUM)],
+    ]
+    for n, address in template_instances(layout, "bufferstorage_temperature"):
+        sensor_types += [
+            [DEFAULT_MODBUS_ADDRESS, address, SensorEntityDescription(name=f"Pufferspeicher {n} Temperatur Oben", key=f"bufferstorage_{n}_temperature_top", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+            [DEFAULT_MODBUS_ADDRESS, address + 1, SensorEntityDescription(name=f"Pufferspeicher {n} Temperatur Mitte-Oben", key=f"bufferstorage_{n}_temperature_middletop", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+            [DEFAULT_MODBUS_ADDRESS, address + 2, SensorEntityDescription(name=f"Pufferspeicher {n} Temperatur Mitte-Unten", key=f"bufferstorage_{n}_temperature_middlebottom", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+            [DEFAULT_MODBUS_ADDRESS, address + 3, SensorEntityDescription(name=f"Pufferspeicher {n} Temperatur Unten", key=f"bufferstorage_{n}_temperature_bottom", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+        ]
+    sensor_types += [
+        [DEFAULT_MODBUS_ADDRESS, 109, SensorEntityDescription(name="Pufferspeicher Lade/Umschalt Mischer Status", key="bufferstorage_charge_or_switch_mixerstatus", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 110, BinarySensorEntityDescription(name="Pufferspeicher Lade/Umschalt Mischer normiert", key="bufferstorage_charge_or_switch_mixernormed")],
+        [DEFAULT_MODBUS_ADDRESS, 111, SensorEntityDescription(name="Pufferspeicher Lade/Umschalt Mischer Position", key="bufferstorage_charge_or_switch_mixerposition", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=PERCENTAGE)],
+        [DEFAULT_MODBUS_ADDRESS, 112, SensorEntityDescription(name="Pufferspeicher Ladepumpenstatus", key="bufferstorage_chargepumpstatus", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 113, SensorEntityDescription(name="Pufferspeicher Ladewassertemperatur", key="bufferstorage_chargewatertemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+    ]
+    for n, address in template_instances(layout, "bufferstorage_filllevel"):
+        sensor_types += [
+            [DEFAULT_MODBUS_ADDRESS, address, SensorEntityDescription(name=f"Pufferspeicher {n} Füllstand", key=f"bufferstorage_{n}_filllevel", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=PERCENTAGE)],
+        ]
+    sensor_types += [
+        [DEFAULT_MODBUS_ADDRESS, 116, SensorEntityDescription(name="Pufferspeicher kombinierter Füllstand", key="bufferstorage_combined_filllevel", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=PERCENTAGE)],
+        [DEFAULT_MODBUS_ADDRESS, 117, SensorEntityDescription(name="Pufferspeicher Aktiv Status", key="bufferstorage_active_status", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 118, SensorEntityDescription(name="Pufferspeicher Ladeventilventilstatus", key="bufferstorage_chargevalvestatus", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 119, SensorEntityDescription(name="Pufferspeicher Ladestatus", key="bufferstorage_chargestatus", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 120, SwitchEntityDescription(name="Pufferspeicher nur E-Laden", key="bufferstorage_chargeElectricOnly", device_class=SwitchDeviceClass.SWITCH)],
+        #WarmWater
+        [DEFAULT_MODBUS_ADDRESS, 140, SensorEntityDescription(name="Warmwasser Boiler Status", key="warmwater_boiler_status", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 141, SensorEntityDescription(name="Warmwasser Boiler Temperatur", key="warmwater_boiler_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+        [DEFAULT_MODBUS_ADDRESS, 142, SensorEntityDescription(name="Warmwasser Boiler Ladepumpenstatus", key="warmwater_boiler_chargepumpstatus", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 143, SensorEntityDescription(name="Warmwasser Boiler Umschaltventilstatus", key="warmwater_boiler_valvestatus", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 144, ButtonEntityDescription(name="Warmwasser Boiler manuell laden", key="warmwater_boiler_manualChargeRequest", icon="mdi:water-boiler"), 1],
+        [DEFAULT_MODBUS_ADDRESS, 144, ButtonEntityDescription(name="Warmwasser Boiler manuell laden beenden", key="warmwater_boiler_manualChargeRequestEnd", icon="mdi:water-boiler-off"), 2],
+        [DEFAULT_MODBUS_ADDRESS, 147, BinarySensorEntityDescription(name="Warmwasser Bad heizen aktiv", key="warmwater_bath_heatingactive")],
+        [DEFAULT_MODBUS_ADDRESS, 150, SensorEntityDescription(name="Warmwasser Zirkulation Abgabetemperatur", key="warmwater_circulation_outputtemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+        [DEFAULT_MODBUS_ADDRESS, 151, SensorEntityDescription(name="Warmwasser Zirkulation Pumpenstatus", key="warmwater_circulation_pumpstatus", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 152, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 1 Status", key="warmwater_circulation_circuit1_status", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 153, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 1 Temperatur", key="warmwater_circulation_circuit1_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+        [DEFAULT_MODBUS_ADDRESS, 154, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 1 Ventilstatus", key="warmwater_circulation_circuit1_valvestatus", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 155, ButtonEntityDescription(name="Warmwasser Zirkulation Kreis 1 Start", key="warmwater_circulation_circuit1_request_start", icon="mdi:water-pump"), 2],
+        [DEFAULT_MODBUS_ADDRESS, 155, ButtonEntityDescription(name="Warmwasser Zirkulation Kreis 1 Stop", key="warmwater_circulation_circuit1_request_stop", icon="mdi:water-pump-off"), 1],
+        [DEFAULT_MODBUS_ADDRESS, 156, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 2 Status", key="warmwater_circulation_circuit2_status", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 157, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 2 Temperatur", key="warmwater_circulation_circuit2_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+        [DEFAULT_MODBUS_ADDRESS, 158, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 2 Ventilstatus", key="warmwater_circulation_circuit2_valvestatus", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 159, ButtonEntityDescription(name="Warmwasser Zirkulation Kreis 2 Start", key="warmwater_circulation_circuit2_request_start", icon="mdi:water-pump"), 2],
+        [DEFAULT_MODBUS_ADDRESS, 159, ButtonEntityDescription(name="Warmwasser Zirkulation Kreis 2 Stop", key="warmwater_circulation_circuit2_request_stop", icon="mdi:water-pump-off"), 1],
+        #Woodburner
+        [DEFAULT_MODBUS_ADDRESS, 170, SensorEntityDescription(name="Holzofen Status", key="woodburner_status", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 171, SensorEntityDescription(name="Holzofen Abgastemperatur", key="woodburner_exhaust_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+        [DEFAULT_MODBUS_ADDRESS, 172, SensorEntityDescription(name="Holzofen Wassertemperatur", key="woodburner_water_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],    
+        [DEFAULT_MODBUS_ADDRESS, 173, ButtonEntityDescription(name="Holzofen Schüralarm beenden", key="woodburner_stop_schueralarm", icon="mdi:alarm-light-off"), 1],
+        #Gasburner
+        [DEFAULT_MODBUS_ADDRESS, 180, SensorEntityDescription(name="Gasbrenner Status", key="gasburner_status", device_class=SensorDeviceClass.ENUM)],
+        [DEFAULT_MODBUS_ADDRESS, 181, SensorEntityDescription(name="Gasbrenner Abgastemperatur", key="gasburner_exhaust_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+        [DEFAULT_MODBUS_ADDRESS, 182, SensorEntityDescription(name="Gasbrenner Wassertemperatur", key="gasburner_water_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
+    ]
+    return sensor_types
+
+_PLATFORM_BY_DESCRIPTION = {
+    "SensorEntityDescription": "sensor",
+    "BinarySensorEntityDescription": "binary_sensor",
+    "SwitchEntityDescription": "switch",
+    "ButtonEntityDescription": "button",
+    "NumberEntityDescription": "number",
+    "TimeEntityDescription": "time",
+    "SelectEntityDescription": "select",
+}
+
+@functools.cache
+def _platform_entities(layout):
+    """HHCSENSOR_TYPES grouped by platform, so every platform setup only walks its own entities."""
+    platform_entities = {}
+    for sensor_info in get_sensor_types(layout):
+        platform = _PLATFORM_BY_DESCRIPTION[type(sensor_info[2]).__name__]
+        platform_entities.setdefault(platform, []).append(HHCEntityInfo(*sensor_info))
+    return platform_entities
+
+def get_platform_entities(platform, layout=DEFAULT_LAYOUT):
+    """Return the HHCEntityInfo records of one platform."""
+    return _platform_entities(layout).get(platform, [])
+
+def __getattr__(name):
+    if name == "HHCSENSOR_TYPES":
+        return get_sensor_types()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+#entity key: codec name of the hub's codec table, entities without codec (buttons) are not polled
+#template keys are formatted with the instance number n
+HHC_TEMPLATE_CODECS = {
+    "heatcircuit": {
+        "heatcircuit_{n}_status": "hc_status",
+        "heatcircuit_{n}_pumpstatus": "pump_status",
+        "heatcircuit_{n}_mixerstatus": "mixer_status",
+        "heatcircuit_{n}_mixernormed": "bool",
+        "heatcircuit_{n}_mixerposition": "mixerposition",
+        "heatcircuit_{n}_targetForerunTemperature": "mixerposition",
+        "heatcircuit_{n}_forerunTemperature": "temperature",
+        "heatcircuit_{n}_returnflowTemperature": "temperature",
+        "heatcircuit_{n}_mode_overwrite": "uint16",
+        "heatcircuit_{n}_timer_1_mode": "uint16",
+        "heatcircuit_{n}_timer_1_start": "uint16",
+        "heatcircuit_{n}_timer_1_stop": "uint16",
+        "heatcircuit_{n}_timer_2_mode": "uint16",
+        "heatcircuit_{n}_timer_2_start": "uint16",
+        "heatcircuit_{n}_timer_2_stop": "uint16",
+        "heatcircuit_{n}_curve_inclination": "uint16",
+        "heatcircuit_{n}_curve_niveau": "int16",
+        "heatcircuit_{n}_curve_targettemperature_day": "uint16",
+        "heatcircuit_{n}_curve_targettemperature_night": "uint16",
+    },
+    "bufferstorage_temperature": {
+        "bufferstorage_{n}_temperature_top": "temperature",
+        "bufferstorage_{n}_temperature_middletop": "temperature",
+        "bufferstorage_{n}_temperature_middlebottom": "temperature",
+        "bufferstorage_{n}_temperature_bottom": "temperature",
+    },
+    "bufferstorage_filllevel": {
+        "bufferstorage_{n}_filllevel": "filllevel",
+    },
+}
+
+REGISTER_CODECS = {
+    "fbl_sw_version": "fbl_sw_version",
+    "appl_sw_version": "appl_sw_version",
+    "dtcactive": "bool",
+    "outsidetemperature": "temperature",
+    "room1temperature": "temperature",
+    "room2temperature": "temperature",
+    "doorbell_status": "pump_status",
+    "heatcontrolmanagement_enabled": "bool",
+    "heatcontrolmanagement_lowTemperatureWarning": "bool",
+    "bufferstorage_status": "bufferstorage_status",
+    "bufferstorage_charge_or_switch_mixerstatus": "mixer_status",
+    "bufferstorage_charge_or_switch_mixernormed": "bool",
+    "bufferstorage_charge_or_switch_mixerposition": "mixerposition",
+    "bufferstorage_chargepumpstatus": "pump_status",
+    "bufferstorage_chargewatertemperature": "temperature",
+    "bufferstorage_combined_filllevel": "filllevel",
+    "bufferstorage_active_status": "bufferstorage_active_status",
+    "bufferstorage_chargevalvestatus": "valve_status",
+    "bufferstorage_chargestatus": "bufferstorage_charge_status",
+    "bufferstorage_chargeElectricOnly": "bool",
+    "warmwater_boiler_status": "warmwater_boiler_status",
+    "warmwater_boiler_temperature": "temperature",
+    "warmwater_boiler_chargepumpstatus": "pump_status",
+    "warmwater_boiler_valvestatus": "valve_status",
+    "warmwater_bath_heatingactive": "bool",
+    "warmwater_circulation_outputtemperature": "temperature",
+    "warmwater_circulation_pumpstatus": "pump_status",
+    "warmwater_circulation_circuit1_status": "circulation_circuit_status",
+    "warmwater_circulation_circuit1_temperature": "temperature",
+    "warmwater_circulation_circuit1_valvestatus": "valve_status",
+    "warmwater_circulation_circuit2_status": "circulation_circuit_status",
+    "warmwater_circulation_circuit2_temperature": "temperature",
+    "warmwater_circulation_circuit2_valvestatus": "valve_status",
+    "woodburner_status": "burner_status",
+    "woodburner_exhaust_temperature": "temperature",
+    "woodburner_water_temperature": "temperature",
+    "gasburner_status": "burner_status",
+    "gasburner_exhaust_temperature": "temperature",
+    "gasburner_water_temperature": "temperature",
+}
+
+#writable key: keys of the status registers the controller changes within a second after a write
+#they are read again WRITE_FOLLOWUP_DELAY seconds after the write instead of on the next cycle
+HHC_WRITE_DEPENDENCIES = {
+    "dtcclear": ["dtcactive", DTC_STATUS_KEY],
+    "bufferstorage_chargeElectricOnly": ["bufferstorage_chargestatus", "bufferstorage_chargepumpstatus", "bufferstorage_chargevalvestatus"],
+    "warmwater_boiler_manualChargeRequest": ["warmwater_boiler_status", "warmwater_boiler_chargepumpstatus", "warmwater_boiler_valvestatus"],
+    "warmwater_boiler_manualChargeRequestEnd": ["warmwater_boiler_status", "warmwater_boiler_chargepumpstatus", "warmwater_boiler_valvestatus"],
+    "warmwater_circulation_circuit1_request_start": ["warmwater_circulation_circuit1_status", "warmwater_circulation_circuit1_valvestatus", "warmwater_circulation_pumpstatus"],
+    "warmwater_circulation_circuit1_request_stop": ["warmwater_circulation_circuit1_status", "warmwater_circulation_circuit1_valvestatus", "warmwater_circulation_pumpstatus"],
+    "warmwater_circulation_circuit2_request_start": ["warmwater_circulation_circuit2_status", "warmwater_circulation_circuit2_valvestatus", "warmwater_circulation_pumpstatus"],
+    "warmwater_circulation_circuit2_request_stop": ["warmwater_circulation_circuit2_status", "warmwater_circulation_circuit2_valvestatus", "warmwater_circulation_pumpstatus"],
+    "woodburner_stop_schueralarm": ["woodburner_status"],
+}
+
+#write dependencies and subsystems of the template instances, keys are formatted with the instance number n
+HHC_TEMPLATE_WRITE_DEPENDENCIES = {
+    "heatcircuit": {
+        "heatcircuit_{n}_mode_overwrite": [
+            "heatcircuit_{n}_status",
+            "heatcircuit_{n}_pumpstatus",
+            "heatcircuit_{n}_mixerstatus",
+            "heatcircuit_{n}_mixerposition",
+            "heatcircuit_{n}_targetForerunTemperature",
+        ],
+    },
+}
+
+HHC_TEMPLATE_SUBSYSTEMS = {
+    "heatcircuit": {
+        "heatcircuit_{n}": ["heatcircuit_{n}_status", 0],
+    },
+}
+
+def _expand_templates(layout, fixed, templates, expand):
+    expanded = dict(fixed)
+    for name, entries in templates.items():
+        for n, _address in template_instances(layout, name):
+            for key, value in entries.items():
+                expanded[key.format(n=n)] = expand(value, n)
+    return expanded
+
+@functools.cache
+def get_register_codecs(layout=DEFAULT_LAYOUT):
+    """Return REGISTER_CODECS with the template registers of a layout."""
+    return _expand_templates(layout, REGISTER_CODECS, HHC_TEMPLATE_CODECS, lambda codec, n: codec)
+
+@functools.cache
+def get_write_dependencies(layout=DEFAULT_LAYOUT):
+    """Return HHC_WRITE_DEPENDENCIES with the template registers of a layout."""
+    return _expand_templates(
+        layout,
+        HHC_WRITE_DEPENDENCIES,
+        HHC_TEMPLATE_WRITE_DEPENDENCIES,
+        lambda dependents, n: [dependent.format(n=n) for dependent in dependents],
+    )
 
-HHCSENSOR_TYPES = [
-    #General
-    [DEFAULT_MODBUS_ADDRESS, 0, SensorEntityDescription(name="FBL Software Version", key="fbl_sw_version", icon="mdi:chip")],
-    [DEFAULT_MODBUS_ADDRESS, 1, SensorEntityDescription(name="APPL Software Version", key="appl_sw_version", icon="mdi:chip")],
-    [DEFAULT_MODBUS_ADDRESS, 3, BinarySensorEntityDescription(name="DTCs Aktiv", key="dtcactive", device_class=BinarySensorDeviceClass.PROBLEM)],
-    [DEFAULT_MODBUS_ADDRESS, 4, ButtonEntityDescription(name="DTCs Löschen", key="dtcclear", icon="mdi:notification-clear-all"), 1],
-    #General Temperatures
-    [DEFAULT_MODBUS_ADDRESS, 20, SensorEntityDescription(name="Außentemperatur", key="outsidetemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 21, SensorEntityDescription(name="Raum 1 Temperatur", key="room1temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 22, SensorEntityDescription(name="Raum 2 Temperatur", key="room2temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    #Doorbell
-    [DEFAULT_MODBUS_ADDRESS, 25, SensorEntityDescription(name="Türklingel Status", key="doorbell_status", device_class=SensorDeviceClass.ENUM, icon="mdi:bell")],
-    #Heat control management
-    [DEFAULT_MODBUS_ADDRESS, 30, SwitchEntityDescription(name="Hauptschalter", key="heatcontrolmanagement_enabled", device_class=SwitchDeviceClass.SWITCH)],
-    [DEFAULT_MODBUS_ADDRESS, 31, BinarySensorEntityDescription(name="Temperatur niedrig Warnung", key="heatcontrolmanagement_lowTemperatureWarning", device_class=BinarySensorDeviceClass.COLD)],
-    #HC1
-    [DEFAULT_MODBUS_ADDRESS, 40, SensorEntityDescription(name="HK1 Status", key="heatcircuit_1_status", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 41, SensorEntityDescription(name="HK1 Pumpenstatus", key="heatcircuit_1_pumpstatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 42, SensorEntityDescription(name="HK1 Mischerstatus", key="heatcircuit_1_mixerstatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 43, BinarySensorEntityDescription(name="HK1 Mischer normiert", key="heatcircuit_1_mixernormed")],
-    [DEFAULT_MODBUS_ADDRESS, 44, SensorEntityDescription(name="HK1 Mischer Position", key="heatcircuit_1_mixerposition", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=PERCENTAGE)],
-    [DEFAULT_MODBUS_ADDRESS, 45, SensorEntityDescription(name="HK1 Zielvorlauftemperatur", key="heatcircuit_1_targetForerunTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 46, SensorEntityDescription(name="HK1 Vorlauftemperatur", key="heatcircuit_1_forerunTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 47, SensorEntityDescription(name="HK1 Rücklauftemperatur", key="heatcircuit_1_returnflowTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 49, SelectEntityDescription(name="HK1 Modus überschreiben", key="heatcircuit_1_mode_overwrite", options=["Keine Anforderung", "Heizung AUS", "Nachtabsenkung", "Tagbetrieb"], icon="mdi:cogs")],    
-    [DEFAULT_MODBUS_ADDRESS, 50, SelectEntityDescription(name="HK1 Timer 1 Modus", key="heatcircuit_1_timer_1_mode", options=["Nicht benutzt", "Heizung AUS", "Nachtabsenkung"], icon="mdi:timer-cog")],
-    [DEFAULT_MODBUS_ADDRESS, 51, TimeEntityDescription(name="HK1 Timer 1 Start", key="heatcircuit_1_timer_1_start", icon="mdi:timer")],
-    [DEFAULT_MODBUS_ADDRESS, 52, TimeEntityDescription(name="HK1 Timer 1 Stop", key="heatcircuit_1_timer_1_stop", icon="mdi:timer-off")],
-    [DEFAULT_MODBUS_ADDRESS, 53, SelectEntityDescription(name="HK1 Timer 2 Modus", key="heatcircuit_1_timer_2_mode", options=["Nicht benutzt", "Heizung AUS", "Nachtabsenkung"], icon="mdi:timer-cog")],
-    [DEFAULT_MODBUS_ADDRESS, 54, TimeEntityDescription(name="HK1 Timer 2 Start", key="heatcircuit_1_timer_2_start", icon="mdi:timer")],
-    [DEFAULT_MODBUS_ADDRESS, 55, TimeEntityDescription(name="HK1 Timer 2 Stop", key="heatcircuit_1_timer_2_stop", icon="mdi:timer-off")],
-    [DEFAULT_MODBUS_ADDRESS, 56, NumberEntityDescription(name="HK1 Kurve Neigung", key="heatcircuit_1_curve_inclination", mode=NumberMode.BOX, native_min_value=0.2, native_max_value=3.5, native_step=0.1, icon="mdi:home-thermometer"), 0.1],
-    [DEFAULT_MODBUS_ADDRESS, 57, NumberEntityDescription(name="HK1 Kurve Niveau", key="heatcircuit_1_curve_niveau", unit_of_measurement=UnitOfTemperature.KELVIN, mode=NumberMode.BOX, native_min_value=-30, native_max_value=30, native_step=1, icon="mdi:home-thermometer"), 1],
-    [DEFAULT_MODBUS_ADDRESS, 58, NumberEntityDescription(name="HK1 Kurve Zieltemperatur Tag", key="heatcircuit_1_curve_targettemperature_day", unit_of_measurement=UnitOfTemperature.CELSIUS, mode=NumberMode.BOX, native_min_value=0, native_max_value=40, native_step=1, icon="mdi:sun-thermometer"), 1],
-    [DEFAULT_MODBUS_ADDRESS, 59, NumberEntityDescription(name="HK1 Kurve Zieltemperatur Nacht", key="heatcircuit_1_curve_targettemperature_night", unit_of_measurement=UnitOfTemperature.CELSIUS, mode=NumberMode.BOX, native_min_value=0, native_max_value=40, native_step=1, icon="mdi:snowflake-thermometer"), 1],
-    #HC2
-    [DEFAULT_MODBUS_ADDRESS, 60, SensorEntityDescription(name="HK2 Status", key="heatcircuit_2_status", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 61, SensorEntityDescription(name="HK2 Pumpenstatus", key="heatcircuit_2_pumpstatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 62, SensorEntityDescription(name="HK2 Mischerstatus", key="heatcircuit_2_mixerstatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 63, BinarySensorEntityDescription(name="HK2 Mischer normiert", key="heatcircuit_2_mixernormed")],
-    [DEFAULT_MODBUS_ADDRESS, 64, SensorEntityDescription(name="HK2 Mischer Position", key="heatcircuit_2_mixerposition", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=PERCENTAGE)],
-    [DEFAULT_MODBUS_ADDRESS, 65, SensorEntityDescription(name="HK2 Zielvorlauftemperatur", key="heatcircuit_2_targetForerunTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 66, SensorEntityDescription(name="HK2 Vorlauftemperatur", key="heatcircuit_2_forerunTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 67, SensorEntityDescription(name="HK2 Rücklauftemperatur", key="heatcircuit_2_returnflowTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 69, SelectEntityDescription(name="HK2 Modus überschreiben", key="heatcircuit_2_mode_overwrite", options=["Keine Anforderung", "Heizung AUS", "Nachtabsenkung", "Tagbetrieb"], icon="mdi:cogs")],  
-    [DEFAULT_MODBUS_ADDRESS, 70, SelectEntityDescription(name="HK2 Timer 1 Modus", key="heatcircuit_2_timer_1_mode", options=["Nicht benutzt", "Heizung AUS", "Nachtabsenkung"], icon="mdi:timer-cog")],
-    [DEFAULT_MODBUS_ADDRESS, 71, TimeEntityDescription(name="HK2 Timer 1 Start", key="heatcircuit_2_timer_1_start", icon="mdi:timer")],
-    [DEFAULT_MODBUS_ADDRESS, 72, TimeEntityDescription(name="HK2 Timer 1 Stop", key="heatcircuit_2_timer_1_stop", icon="mdi:timer-off")],
-    [DEFAULT_MODBUS_ADDRESS, 73, SelectEntityDescription(name="HK2 Timer 2 Modus", key="heatcircuit_2_timer_2_mode", options=["Nicht benutzt", "Heizung AUS", "Nachtabsenkung"], icon="mdi:timer-cog")],
-    [DEFAULT_MODBUS_ADDRESS, 74, TimeEntityDescription(name="HK2 Timer 2 Start", key="heatcircuit_2_timer_2_start", icon="mdi:timer")],
-    [DEFAULT_MODBUS_ADDRESS, 75, TimeEntityDescription(name="HK2 Timer 2 Stop", key="heatcircuit_2_timer_2_stop", icon="mdi:timer-off")],
-    [DEFAULT_MODBUS_ADDRESS, 76, NumberEntityDescription(name="HK2 Kurve Neigung", key="heatcircuit_2_curve_inclination", mode=NumberMode.BOX, native_min_value=0.2, native_max_value=3.5, native_step=0.1, icon="mdi:home-thermometer"), 0.1],
-    [DEFAULT_MODBUS_ADDRESS, 77, NumberEntityDescription(name="HK2 Kurve Niveau", key="heatcircuit_2_curve_niveau", unit_of_measurement=UnitOfTemperature.KELVIN, mode=NumberMode.BOX, native_min_value=-30, native_max_value=30, native_step=1, icon="mdi:home-thermometer"), 1],
-    [DEFAULT_MODBUS_ADDRESS, 78, NumberEntityDescription(name="HK2 Kurve Zieltemperatur Tag", key="heatcircuit_2_curve_targettemperature_day", unit_of_measurement=UnitOfTemperature.CELSIUS, mode=NumberMode.BOX, native_min_value=0, native_max_value=40, native_step=1, icon="mdi:sun-thermometer"), 1],
-    [DEFAULT_MODBUS_ADDRESS, 79, NumberEntityDescription(name="HK2 Kurve Zieltemperatur Nacht", key="heatcircuit_2_curve_targettemperature_night", unit_of_measurement=UnitOfTemperature.CELSIUS, mode=NumberMode.BOX, native_min_value=0, native_max_value=40, native_step=1, icon="mdi:snowflake-thermometer"), 1],
-    #HC3
-    [DEFAULT_MODBUS_ADDRESS, 80, SensorEntityDescription(name="HK3 Status", key="heatcircuit_3_status", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 81, SensorEntityDescription(name="HK3 Pumpenstatus", key="heatcircuit_3_pumpstatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 82, SensorEntityDescription(name="HK3 Mischerstatus", key="heatcircuit_3_mixerstatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 83, BinarySensorEntityDescription(name="HK3 Mischer normiert", key="heatcircuit_3_mixernormed")],
-    [DEFAULT_MODBUS_ADDRESS, 84, SensorEntityDescription(name="HK3 Mischer Position", key="heatcircuit_3_mixerposition", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=PERCENTAGE)],
-    [DEFAULT_MODBUS_ADDRESS, 85, SensorEntityDescription(name="HK3 Zielvorlauftemperatur", key="heatcircuit_3_targetForerunTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 86, SensorEntityDescription(name="HK3 Vorlauftemperatur", key="heatcircuit_3_forerunTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 87, SensorEntityDescription(name="HK3 Rücklauftemperatur", key="heatcircuit_3_returnflowTemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 59, SelectEntityDescription(name="HK3 Modus überschreiben", key="heatcircuit_3_mode_overwrite", options=["Keine Anforderung", "Heizung AUS", "Nachtabsenkung", "Tagbetrieb"], icon="mdi:cogs")],  
-    [DEFAULT_MODBUS_ADDRESS, 90, SelectEntityDescription(name="HK3 Timer 1 Modus", key="heatcircuit_3_timer_1_mode", options=["Nicht benutzt", "Heizung AUS", "Nachtabsenkung"], icon="mdi:timer-cog")],
-    [DEFAULT_MODBUS_ADDRESS, 91, TimeEntityDescription(name="HK3 Timer 1 Start", key="heatcircuit_3_timer_1_start", icon="mdi:timer")],
-    [DEFAULT_MODBUS_ADDRESS, 92, TimeEntityDescription(name="HK3 Timer 1 Stop", key="heatcircuit_3_timer_1_stop", icon="mdi:timer-off")],
-    [DEFAULT_MODBUS_ADDRESS, 93, SelectEntityDescription(name="HK3 Timer 2 Modus", key="heatcircuit_3_timer_2_mode", options=["Nicht benutzt", "Heizung AUS", "Nachtabsenkung"], icon="mdi:timer-cog")],
-    [DEFAULT_MODBUS_ADDRESS, 94, TimeEntityDescription(name="HK3 Timer 2 Start", key="heatcircuit_3_timer_2_start", icon="mdi:timer")],
-    [DEFAULT_MODBUS_ADDRESS, 95, TimeEntityDescription(name="HK3 Timer 2 Stop", key="heatcircuit_3_timer_2_stop", icon="mdi:timer-off")],
-    [DEFAULT_MODBUS_ADDRESS, 96, NumberEntityDescription(name="HK3 Kurve Neigung", key="heatcircuit_3_curve_inclination", mode=NumberMode.BOX, native_min_value=0.2, native_max_value=3.5, native_step=0.1, icon="mdi:home-thermometer"), 0.1],
-    [DEFAULT_MODBUS_ADDRESS, 97, NumberEntityDescription(name="HK3 Kurve Niveau", key="heatcircuit_3_curve_niveau", unit_of_measurement=UnitOfTemperature.KELVIN, mode=NumberMode.BOX, native_min_value=-30, native_max_value=30, native_step=1, icon="mdi:home-thermometer"), 1],
-    [DEFAULT_MODBUS_ADDRESS, 98, NumberEntityDescription(name="HK3 Kurve Zieltemperatur Tag", key="heatcircuit_3_curve_targettemperature_day", unit_of_measurement=UnitOfTemperature.CELSIUS, mode=NumberMode.BOX, native_min_value=0, native_max_value=40, native_step=1, icon="mdi:sun-thermometer"), 1],
-    [DEFAULT_MODBUS_ADDRESS, 99, NumberEntityDescription(name="HK3 Kurve Zieltemperatur Nacht", key="heatcircuit_3_curve_targettemperature_night", unit_of_measurement=UnitOfTemperature.CELSIUS, mode=NumberMode.BOX, native_min_value=0, native_max_value=40, native_step=1, icon="mdi:snowflake-thermometer"), 1],
-    #Bufferstorage
-    [DEFAULT_MODBUS_ADDRESS, 100, SensorEntityDescription(name="Pufferspeicher Status", key="bufferstorage_status", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 101, SensorEntityDescription(name="Pufferspeicher 1 Temperatur Oben", key="bufferstorage_1_temperature_top", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 102, SensorEntityDescription(name="Pufferspeicher 1 Temperatur Mitte-Oben", key="bufferstorage_1_temperature_middletop", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 103, SensorEntityDescription(name="Pufferspeicher 1 Temperatur Mitte-Unten", key="bufferstorage_1_temperature_middlebottom", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 104, SensorEntityDescription(name="Pufferspeicher 1 Temperatur Unten", key="bufferstorage_1_temperature_bottom", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 105, SensorEntityDescription(name="Pufferspeicher 2 Temperatur Oben", key="bufferstorage_2_temperature_top", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 106, SensorEntityDescription(name="Pufferspeicher 2 Temperatur Mitte-Oben", key="bufferstorage_2_temperature_middletop", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 107, SensorEntityDescription(name="Pufferspeicher 2 Temperatur Mitte-Unten", key="bufferstorage_2_temperature_middlebottom", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 108, SensorEntityDescription(name="Pufferspeicher 2 Temperatur Unten", key="bufferstorage_2_temperature_bottom", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 109, SensorEntityDescription(name="Pufferspeicher Lade/Umschalt Mischer Status", key="bufferstorage_charge_or_switch_mixerstatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 110, BinarySensorEntityDescription(name="Pufferspeicher Lade/Umschalt Mischer normiert", key="bufferstorage_charge_or_switch_mixernormed")],
-    [DEFAULT_MODBUS_ADDRESS, 111, SensorEntityDescription(name="Pufferspeicher Lade/Umschalt Mischer Position", key="bufferstorage_charge_or_switch_mixerposition", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=PERCENTAGE)],
-    [DEFAULT_MODBUS_ADDRESS, 112, SensorEntityDescription(name="Pufferspeicher Ladepumpenstatus", key="bufferstorage_chargepumpstatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 113, SensorEntityDescription(name="Pufferspeicher Ladewassertemperatur", key="bufferstorage_chargewatertemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 114, SensorEntityDescription(name="Pufferspeicher 1 Füllstand", key="bufferstorage_1_filllevel", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=PERCENTAGE)],
-    [DEFAULT_MODBUS_ADDRESS, 115, SensorEntityDescription(name="Pufferspeicher 2 Füllstand", key="bufferstorage_2_filllevel", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=PERCENTAGE)],
-    [DEFAULT_MODBUS_ADDRESS, 116, SensorEntityDescription(name="Pufferspeicher kombinierter Füllstand", key="bufferstorage_combined_filllevel", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=PERCENTAGE)],
-    [DEFAULT_MODBUS_ADDRESS, 117, SensorEntityDescription(name="Pufferspeicher Aktiv Status", key="bufferstorage_active_status", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 118, SensorEntityDescription(name="Pufferspeicher Ladeventilventilstatus", key="bufferstorage_chargevalvestatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 119, SensorEntityDescription(name="Pufferspeicher Ladestatus", key="bufferstorage_chargestatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 120, SwitchEntityDescription(name="Pufferspeicher nur E-Laden", key="bufferstorage_chargeElectricOnly", device_class=SwitchDeviceClass.SWITCH)],
-    #WarmWater
-    [DEFAULT_MODBUS_ADDRESS, 140, SensorEntityDescription(name="Warmwasser Boiler Status", key="warmwater_boiler_status", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 141, SensorEntityDescription(name="Warmwasser Boiler Temperatur", key="warmwater_boiler_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 142, SensorEntityDescription(name="Warmwasser Boiler Ladepumpenstatus", key="warmwater_boiler_chargepumpstatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 143, SensorEntityDescription(name="Warmwasser Boiler Umschaltventilstatus", key="warmwater_boiler_valvestatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 144, ButtonEntityDescription(name="Warmwasser Boiler manuell laden", key="warmwater_boiler_manualChargeRequest", icon="mdi:water-boiler"), 1],
-    [DEFAULT_MODBUS_ADDRESS, 144, ButtonEntityDescription(name="Warmwasser Boiler manuell laden beenden", key="warmwater_boiler_manualChargeRequestEnd", icon="mdi:water-boiler-off"), 2],
-    [DEFAULT_MODBUS_ADDRESS, 147, BinarySensorEntityDescription(name="Warmwasser Bad heizen aktiv", key="warmwater_bath_heatingactive")],
-    [DEFAULT_MODBUS_ADDRESS, 150, SensorEntityDescription(name="Warmwasser Zirkulation Abgabetemperatur", key="warmwater_circulation_outputtemperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 151, SensorEntityDescription(name="Warmwasser Zirkulation Pumpenstatus", key="warmwater_circulation_pumpstatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 152, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 1 Status", key="warmwater_circulation_circuit1_status", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 153, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 1 Temperatur", key="warmwater_circulation_circuit1_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 154, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 1 Ventilstatus", key="warmwater_circulation_circuit1_valvestatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 155, ButtonEntityDescription(name="Warmwasser Zirkulation Kreis 1 Start", key="warmwater_circulation_circuit1_request_start", icon="mdi:water-pump"), 2],
-    [DEFAULT_MODBUS_ADDRESS, 155, ButtonEntityDescription(name="Warmwasser Zirkulation Kreis 1 Stop", key="warmwater_circulation_circuit1_request_stop", icon="mdi:water-pump-off"), 1],
-    [DEFAULT_MODBUS_ADDRESS, 156, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 2 Status", key="warmwater_circulation_circuit2_status", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 157, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 2 Temperatur", key="warmwater_circulation_circuit2_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 158, SensorEntityDescription(name="Warmwasser Zirkulation Kreis 2 Ventilstatus", key="warmwater_circulation_circuit2_valvestatus", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 159, ButtonEntityDescription(name="Warmwasser Zirkulation Kreis 2 Start", key="warmwater_circulation_circuit2_request_start", icon="mdi:water-pump"), 2],
-    [DEFAULT_MODBUS_ADDRESS, 159, ButtonEntityDescription(name="Warmwasser Zirkulation Kreis 2 Stop", key="warmwater_circulation_circuit2_request_stop", icon="mdi:water-pump-off"), 1],
-    #Woodburner
-    [DEFAULT_MODBUS_ADDRESS, 170, SensorEntityDescription(name="Holzofen Status", key="woodburner_status", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 171, SensorEntityDescription(name="Holzofen Abgastemperatur", key="woodburner_exhaust_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 172, SensorEntityDescription(name="Holzofen Wassertemperatur", key="woodburner_water_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],    
-    [DEFAULT_MODBUS_ADDRESS, 173, ButtonEntityDescription(name="Holzofen Schüralarm beenden", key="woodburner_stop_schueralarm", icon="mdi:alarm-light-off"), 1],
-    #Gasburner
-    [DEFAULT_MODBUS_ADDRESS, 180, SensorEntityDescription(name="Gasbrenner Status", key="gasburner_status", device_class=SensorDeviceClass.ENUM)],
-    [DEFAULT_MODBUS_ADDRESS, 181, SensorEntityDescription(name="Gasbrenner Abgastemperatur", key="gasburner_exhaust_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-    [DEFAULT_MODBUS_ADDRESS, 182, SensorEntityDescription(name="Gasbrenner Wassertemperatur", key="gasburner_water_temperature", state_class=SensorStateClass.MEASUREMENT, device_class=SensorDeviceClass.TEMPERATURE, unit_of_measurement=UnitOfTemperature.CELSIUS)],
-]
\ No newline at end of file
+@functools.cache
+def get_subsystems(layout=DEFAULT_LAYOUT):
+    """Return HHC_SUBSYSTEMS with the template subsystems of a layout."""
+    return _expand_templates(
+        layout,
+        HHC_SUBSYSTEMS,
+        HHC_TEMPLATE_SUBSYSTEMS,
+        lambda subsystem, n: [subsystem[0].format(n=n), subsystem[1]],
+    )
@@ -0,0 +1,19 @@
+"""Diagnostics download of a HHC config entry."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+#the config flow uses the host as unique_id
+TO_REDACT = {CONF_HOST, "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return the config entry, the register image as hex, the read plan and tiers, block errors and the last cycles."""
+    hub = hass.data[DOMAIN][entry.data["name"]]["hub"]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "hub": hub.get_diagnostics(),
+    }
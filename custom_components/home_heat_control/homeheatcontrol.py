@@ -1,15 +1,62 @@
+import asyncio
+import bisect
+import cProfile
+import io
 import logging
+import os
+import pstats
 import threading
+import time
+from collections import deque
 from typing import Optional
 from datetime import timedelta, datetime
 
 import pymodbus
 from pymodbus.client import ModbusTcpClient
+from pymodbus.pdu import ExceptionResponse
 
+from homeassistant.components.sensor import SensorEntityDescription, SensorStateClass
 from homeassistant.core import callback
-from homeassistant.helpers.event import async_track_time_interval
-
-from .const import DEFAULT_MODBUS_TIMEOUT
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .const import (
+    DOMAIN,
+    DEFAULT_MODBUS_TIMEOUT,
+    PROBE_TIMEOUT,
+    PROBE_RETRIES,
+    MODBUS_MAX_READ_COUNT,
+    MODBUS_MAX_WRITE_COUNT,
+    STORAGE_VERSION,
+    REGISTER_MAP_SAVE_DELAY,
+    SNAPSHOT_SAVE_INTERVAL,
+    SNAPSHOT_MAX_AGE,
+    SENTINEL_VALUES,
+    SENTINEL_PRUNE_CYCLES,
+    PRUNED_REVALIDATE_INTERVAL,
+    WRITE_FOLLOWUP_DELAY,
+    DIAGNOSTICS_CYCLES,
+    PROFILE_TOP_FUNCTIONS,
+    DELTA_EVENT,
+    DTC_STATUS_KEY,
+    CONF_INSTALLED_SUBSYSTEMS,
+    CONF_APPL_SW_VERSION,
+    get_platform_entities,
+    get_sensor_types,
+    get_subsystems,
+    get_write_dependencies,
+    HHCEntityInfo,
+)
+from .latency import (
+    READ_HOLDING_REGISTERS,
+    READWRITE_MULTIPLE_REGISTERS,
+    WRITE_MULTIPLE_REGISTERS,
+    WRITE_SINGLE_REGISTER,
+    LatencyHistogram,
+    TransactionTracer,
+)
+from .pdu_trace import PduTraceRecorder
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,13 +67,187 @@ def bitfield(value, size=None):
     else:
             return [int(digit) for digit in bin(value)[2:]]             # [2:] to chop off the "0b" part 
 
+
+PUMP_STATES = ["Nicht verbaut", "Aus", "An", "Fehler"]
+MIXER_STATES = ["Nicht verbaut", "Aus", "Normierung", "Öffen - Langsam", "Öffnen - Schnell", "Schließen - Langsam", "Schließen - Schnell", "Fehler"]
+VALVE_STATES = ["Nicht verbaut", "Entnormiert", "Offen", "Öffnen", "Geschlossen", "Schließen", "Fehler"]
+HC_STATES = ["Nicht verbaut", "Aus - Manuell", "Aus - Timer", "Nachtbetrieb - Manuell", "Nachtbetrieb - Timer", "Tagbetrieb - Manuell", "Tagbetrieb - Timer", "Fehler"]
+BUFFERSTORAGE_STATES = ["Nicht verbaut", "OK", "Kodierfehler", "Temperatursensorfehler", "Externer Fehler"]
+BUFFERSTORAGE_ACTIVE_STATES = ["Nicht verfügbar", "Pufferspeicher 1", "Pufferspeicher 2", "Beide parallel"]
+BUFFERSTORAGE_CHARGE_STATES = ["Nicht verfügbar", "Nicht aktiv", "Aktiv", "Überladen aktiv", "Vollständig überladen", "Angefordert", "Nachlauf", "Fehler Temperatursensor", "Fehler Extern", "Fehler Kodierung"]
+WARMWATER_BOILER_STATES = ["Nicht verfügbar", "Aus", "manuelles laden", "automatisches laden", "laden wird beendet", "Fehler: Ladevorgang Zeitüberschreitung", "Fehler"]
+CIRCULATION_CIRCUIT_STATES = ["Nicht verbaut", "Aus", "An", "Fehler Kodierung", "Fehler Temperatursensor", "Fehler Pumpe oder Ventil", "Fehler Extern", "Fehler Pufferspeicher unter Mindesttemperatur"]
+BURNER_STATES = ["Nicht verfügbar", "Aus", "Pumpe aktiv", "Brand Startphase", "Brand Startphase fehlgeschlagen", "Brennt", "Brennvorgang beendet", "Fehler - Stromversorgung unterbrochen", "Fehler"]
+TEMPERATURE_STATES = {0x7FFD: "Nicht verbaut", 0x7FFE: "Init", 0x7FFF: "Fehler"}
+FILLLEVEL_STATES = {0xFFFE: "Nicht verbaut", 0xFFFF: "Ungültig"}
+
+def decode_bool(registers):
+    return registers[0] != 0
+
+def decode_unsigned16bit(registers):
+    return registers[0]
+
+def decode_signed16bit(registers):
+    return registers[0] - 0x10000 if registers[0] & 0x8000 else registers[0]
+
+def decode_temperature(registers):
+    if registers[0] in TEMPERATURE_STATES:
+        return TEMPERATURE_STATES[registers[0]]
+    return decode_signed16bit(registers)/10
+
+def decode_mixerposition(registers):
+    if registers[0] > 100:
+        return None
+    return registers[0]
+
+def decode_bufferstorage_filllevel(registers):
+    if registers[0] in FILLLEVEL_STATES:
+        return FILLLEVEL_STATES[registers[0]]
+    return registers[0]/10
+
+def decode_fbl_sw_version(registers):
+    """major.minor in the first register, patch in the high byte of the second"""
+    return f"{registers[0] >> 8}.{registers[0] & 0xFF}.{registers[1] >> 8}"
+
+def decode_appl_sw_version(registers):
+    """major in the low byte of the first register, minor.patch in the second"""
+    return f"{registers[0] & 0xFF}.{registers[1] >> 8}.{registers[1] & 0xFF}"
+
+def decode_dtcs(registers):
+    """numbers of all active DTCs, bit 0 of the first status word is DTC 0"""
+    value = 0
+    for register in reversed(registers):
+        value = (value << 16) | register
+    bits = bitfield(value, size=16*len(registers))
+    return [dtc for dtc, bit in enumerate(reversed(bits)) if bit]
+
+def decode_enum(states):
+    """decoder for status registers, unknown states are reported as None"""
+    def decode(registers):
+        if registers[0] < len(states):
+            return states[registers[0]]
+        return None
+    return decode
+
+#codec name: [number of registers, decoder]
+CODECS = {
+    "bool": (1, decode_bool),
+    "uint16": (1, decode_unsigned16bit),
+    "int16": (1, decode_signed16bit),
+    "temperature": (1, decode_temperature),
+    "mixerposition": (1, decode_mixerposition),
+    "filllevel": (1, decode_bufferstorage_filllevel),
+    "fbl_sw_version": (2, decode_fbl_sw_version),
+    "appl_sw_version": (2, decode_appl_sw_version),
+    "pump_status": (1, decode_enum(PUMP_STATES)),
+    "mixer_status": (1, decode_enum(MIXER_STATES)),
+    "valve_status": (1, decode_enum(VALVE_STATES)),
+    "hc_status": (1, decode_enum(HC_STATES)),
+    "bufferstorage_status": (1, decode_enum(BUFFERSTORAGE_STATES)),
+    "bufferstorage_active_status": (1, decode_enum(BUFFERSTORAGE_ACTIVE_STATES)),
+    "bufferstorage_charge_status": (1, decode_enum(BUFFERSTORAGE_CHARGE_STATES)),
+    "warmwater_boiler_status": (1, decode_enum(WARMWATER_BOILER_STATES)),
+    "circulation_circuit_status": (1, decode_enum(CIRCULATION_CIRCUIT_STATES)),
+    "burner_status": (1, decode_enum(BURNER_STATES)),
+}
+
+def plan_blocks(addresses, max_count=MODBUS_MAX_READ_COUNT, barriers=()):
+    """group register addresses into as few read blocks as possible without spanning a barrier, returns a list of [start, count]"""
+    barriers = sorted(barriers)
+    blocks = []
+    for address in sorted(set(addresses)):
+        if blocks and address - blocks[-1][0] < max_count:
+            block_end = blocks[-1][0] + blocks[-1][1] - 1
+            index = bisect.bisect_right(barriers, block_end)
+            if index == len(barriers) or barriers[index] > address:
+                blocks[-1][1] = address - blocks[-1][0] + 1
+                continue
+        blocks.append([address, 1])
+    return blocks
+
+def _probe_registers(client, registers, values):
+    """read a set of (slave, address) registers into values, registers that can't be read are left out"""
+    for slave in set(unit for unit, _address in registers):
+        addresses = [address for unit, address in registers if unit == slave]
+        for start, count in plan_blocks(addresses):
+            data_package = client.read_holding_registers(address=start, count=count, slave=slave)
+            if not data_package.isError():
+                for address in addresses:
+                    if start <= address < start + count:
+                        values[(slave, address)] = data_package.registers[address - start]
+                continue
+            #the block may span unmapped registers, fall back to single reads
+            _LOGGER.debug(f'Block read error at start address:{start} count:{count}, reading probes one by one')
+            for address in addresses:
+                if start <= address < start + count:
+                    data_package = client.read_holding_registers(address=address, count=1, slave=slave)
+                    if not data_package.isError():
+                        values[(slave, address)] = data_package.registers[0]
+
+def probe_controller(host, port):
+    """read the application firmware version and the status registers of all optional subsystems, returns None if the controller can't be reached"""
+    from .profiles import compile_profile, load_profiles, select_profile
+
+    #the version register itself is the same in all profiles
+    base_profile = compile_profile(select_profile(load_profiles(), None))
+    slave, address, _codec = base_profile["registers"][CONF_APPL_SW_VERSION]
+    version_registers = [(slave, address), (slave, address + 1)]
+
+    values = {}
+    client = ModbusTcpClient(host=host, port=port, timeout=PROBE_TIMEOUT, retries=PROBE_RETRIES)
+    try:
+        if not client.connect():
+            _LOGGER.warning("not able to connect to %s:%s for hardware discovery", host, port)
+            return None
+        _probe_registers(client, version_registers, values)
+        appl_sw_version = None
+        if all(register in values for register in version_registers):
+            appl_sw_version = decode_appl_sw_version([values[register] for register in version_registers])
+
+        #probe the subsystems at the addresses and with the template counts of the firmware's profile
+        profile = compile_profile(select_profile(load_profiles(), appl_sw_version))
+        subsystems = get_subsystems(tuple(tuple(template) for template in profile["layout"]))
+        probes = {}
+        for subsystem, (status_key, not_installed_value) in subsystems.items():
+            slave, address, _codec = profile["registers"].get(status_key, [None, None, None])
+            if address is not None:
+                probes[subsystem] = (slave, address)
+        _probe_registers(client, set(probes.values()), values)
+    except pymodbus.exceptions.ModbusException:
+        _LOGGER.warning("hardware discovery on %s:%s failed", host, port, exc_info=True)
+        return None
+    finally:
+        client.close()
+
+    installed = []
+    for subsystem, (status_key, not_installed_value) in subsystems.items():
+        value = values.get(probes.get(subsystem))
+        #keep subsystems whose status could not be read, better an unused entity than a missing one
+        if value != not_installed_value:
+            installed.append(subsystem)
+    result = {CONF_INSTALLED_SUBSYSTEMS: installed}
+    if appl_sw_version is not None:
+        result[CONF_APPL_SW_VERSION] = appl_sw_version
+    _LOGGER.info(f"hardware discovery on {host}:{port} found: {result}")
+    return result
+
 class HomeHeatControl:
     """Thread safe wrapper class for pymodbus."""
 
-    def __init__(self, hass, name, host, port, address, scan_interval):
+    def __init__(self, hass, name, host, port, address, scan_interval, profile, installed_subsystems=None, appl_sw_version=None, on_firmware_change=None, trace_path=None, transaction_spans=0, delta_event=False):
         """Initialize the Modbus hub."""
         self._hass = hass
-        self._client = ModbusTcpClient(host=host, port=port, timeout=max(3, (scan_interval - 1)))
+        #opt-in recording of all PDUs for offline replay
+        self._trace = PduTraceRecorder(trace_path) if trace_path is not None else None
+        #latency of every transaction, the last transaction_spans are kept as spans
+        self._latency = TransactionTracer(transaction_spans)
+        self._client = ModbusTcpClient(
+            host=host,
+            port=port,
+            timeout=max(3, (scan_interval - 1)),
+            trace_pdu=self._trace.trace_pdu if self._trace is not None else None,
+            trace_packet=self._latency.trace_packet,
+        )
         self._lock = threading.Lock()
         self._readout_active = False
         self._name = name
@@ -35,7 +256,69 @@ class HomeHeatControl:
         self._last_data_received_timestamp = datetime(year=2000, month=1, day=1)
         self._unsub_interval_method = None
         self._sensors = []
-            
+        self._installed_subsystems = installed_subsystems
+        self._profile = profile
+        self._layout = tuple(tuple(template) for template in profile["layout"])
+        self._write_dependencies = get_write_dependencies(self._layout)
+        self._appl_sw_version = appl_sw_version
+        self._on_firmware_change = on_firmware_change
+        self._registers = {}
+        self._read_plan = None
+        self._polled = []
+        self._polled_registers = set()
+        self._sentinel_registers = {}
+        self._slow_registers = set()
+        self._pruned = {}
+        self._sentinel_counts = {}
+        self._last_revalidation = datetime(year=2000, month=1, day=1)
+        self._registers_by_key = {}
+        self._barriers = {}
+        self._dtc_sensor = None
+        self._dtc_registers = []
+        self._register_map_changed = False
+        self._readwrite_supported = None
+        self._followup_registers = set()
+        self._entity_infos = None
+        self._last_fresh = set()
+        self._cycle_running = None
+        self._read_running = None
+        self._refresh_registers = set()
+        self._refresh_task = None
+        self._unsub_followup = None
+        #without hass (cli.py, benchmarks) the learned register map and the snapshot are not persisted
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{slugify(name)}_register_map") if hass is not None else None
+        self._register_timestamps = {}
+        self._snapshot_store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{slugify(name)}_snapshot") if hass is not None else None
+        self._last_snapshot_save = datetime.now()
+        #counters of the diagnostic sensors, cumulative ones only grow
+        self._stats = {
+            "cycle_duration": None,
+            "cycle_transactions": None,
+            "cycle_registers": None,
+            "cycle_lock_wait": None,
+            "transactions": 0,
+            "lock_wait": 0.0,
+            "failed_blocks": 0,
+            "reconnects": 0,
+            "skipped_cycles": 0,
+            "overrun_cycles": 0,
+            "write_queue": 0,
+            "cycles": 0,
+        }
+        self._cycle_histogram = LatencyHistogram()
+        #(slave, start, count) of failed block reads: [errors, last exception code]
+        self._block_errors = {}
+        #(start, duration, transactions, registers) of the last cycles
+        self._cycle_timings = deque(maxlen=DIAGNOSTICS_CYCLES)
+        self._diagnostic_sensors = []
+        #cProfile of the profile service, None when not profiling
+        self._profiler = None
+        self._profile_cycles = 0
+        self._profile_path = None
+        #entity values and registers of the last delta event, None without the delta_event option
+        self._delta_values = {} if delta_event else None
+        self._delta_registers = {}
+
     @callback
     def async_add_homeheatcontrol_sensor(self, sensor):
         """Listen for data updates."""
@@ -45,27 +328,88 @@ class HomeHeatControl:
                 self._hass, self.async_refresh_modbus_data, self._scan_interval
             )
         self._sensors.append(sensor)
+        self._read_plan = None
+        self._async_restore_sensor(sensor)
 
     @callback
     def async_remove_homeheatcontrol_sensor(self, sensor):
         """Remove data update."""
         self._sensors.remove(sensor)
+        self._read_plan = None
 
         if not self._sensors:
             """stop the interval timer upon removal of last sensor"""
             self._unsub_interval_method()
             self._unsub_interval_method = None
+            if self._unsub_followup is not None:
+                self._unsub_followup()
+                self._unsub_followup = None
             self.close()
 
+    @callback
+    def async_add_diagnostic_sensor(self, sensor):
+        """Listen for the hub statistics updated after every cycle."""
+        self._diagnostic_sensors.append(sensor)
+
+    @callback
+    def async_remove_diagnostic_sensor(self, sensor):
+        self._diagnostic_sensors.remove(sensor)
+
+    @property
+    def diagnostics(self):
+        """Return the hub statistics with the age of the last received data in seconds, None before the first data."""
+        data_age = None
+        if self._last_data_received_timestamp.year > 2000:
+            data_age = (datetime.now() - self._last_data_received_timestamp).total_seconds()
+        return {**self._stats, "data_age": data_age}
+
     async def async_refresh_modbus_data(self, _now: Optional[int] = None) -> dict:
         """Time to update."""
-        result : bool = await self._hass.async_add_executor_job(self._refresh_modbus_data)
+        if self._cycle_running is not None:
+            #the interval fired while the last cycle (e.g. the first one or a slow controller) is still running
+            self._stats["skipped_cycles"] += 1
+            return
+        cycle_running = self._cycle_running = asyncio.get_running_loop().create_future()
+        profiler = self._profiler
+        result = False
+        try:
+            #an out-of-cycle read still running would skew the register image and the cycle statistics
+            while self._read_running is not None:
+                await asyncio.shield(self._read_running)
+            result = await self._async_refresh_modbus_data(profiler)
+        finally:
+            if profiler is not None:
+                self._async_profile_cycle_done(profiler)
+            #refresh requests waiting for this cycle, nothing is fresh if the cycle did not read
+            self._cycle_running = None
+            cycle_running.set_result(set(self._last_fresh) if result else set())
+            for sensor in self._diagnostic_sensors:
+                sensor._modbus_data_updated()
+
+    async def _async_refresh_modbus_data(self, profiler=None):
+        result : bool = await self._hass.async_add_executor_job(self._run_profiled, profiler, self._refresh_modbus_data)
+        self._run_profiled(profiler, self._async_update_entities, result)
+        return result
+
+    @callback
+    def _async_update_entities(self, result):
+        """Hand the decoded values of a cycle to the entities, makes them unavailable after DEFAULT_MODBUS_TIMEOUT without data"""
+        if self._register_map_changed:
+            self._register_map_changed = False
+            self._async_save_register_map()
         if result:
             self._last_data_received_timestamp = datetime.now()
+            if self._snapshot_store is not None and (self._last_data_received_timestamp - self._last_snapshot_save).total_seconds() > SNAPSHOT_SAVE_INTERVAL:
+                self._last_snapshot_save = self._last_data_received_timestamp
+                snapshot = self._snapshot_data()
+                self._snapshot_store.async_delay_save(lambda: snapshot, REGISTER_MAP_SAVE_DELAY)
             for sensor in self._sensors:
                 _modbus_data_updated = getattr(sensor, "_modbus_data_updated", None)
                 if callable(_modbus_data_updated):
                     sensor._modbus_data_updated()
+            if self._delta_values is not None:
+                self._async_fire_delta()
+            self._async_check_firmware_version()
         
         if (datetime.now() - self._last_data_received_timestamp).total_seconds() > DEFAULT_MODBUS_TIMEOUT:
             #set all data to None so entities get unavailable
@@ -77,6 +421,73 @@ class HomeHeatControl:
                 if callable(_modbus_data_updated):
                     sensor._modbus_data_updated()
 
+    @callback
+    def _async_fire_delta(self):
+        """Fire one event with the registers and entity values that changed since the last cycle, the first cycle sets the baseline"""
+        values = {}
+        for sensor, attribute, _decoder, _registers in self._polled:
+            key = sensor.entity_description.key if attribute == "_data" else attribute.lstrip("_")
+            values[key] = getattr(sensor, attribute, None)
+        registers = dict(self._registers)
+        if self._delta_values:
+            keys = {
+                key: [self._delta_values.get(key), value]
+                for key, value in values.items()
+                if self._delta_values.get(key) != value
+            }
+            changed_registers = {
+                f"{slave}:{address}": [self._delta_registers.get((slave, address)), value]
+                for (slave, address), value in registers.items()
+                if self._delta_registers.get((slave, address)) != value
+            }
+            if keys or changed_registers:
+                self._hass.bus.async_fire(DELTA_EVENT, {"name": self._name, "registers": changed_registers, "keys": keys})
+        self._delta_values = values
+        self._delta_registers = registers
+
+    @callback
+    def async_start_profile(self, cycles, path):
+        """Profile the read, decode and entity updates of the next cycles, returns False if a profile is already running."""
+        if self._profiler is not None:
+            return False
+        _LOGGER.info(f"Profiling the next {cycles} cycles")
+        self._profile_cycles = cycles
+        self._profile_path = path
+        self._profiler = cProfile.Profile()
+        return True
+
+    def _run_profiled(self, profiler, function, *args):
+        if profiler is None or self._profiler is not profiler:
+            return function(*args)
+        try:
+            profiler.enable()
+        except ValueError:
+            #another profiler is active, e.g. the profiler integration
+            _LOGGER.warning("Another profiler is active, profiling stopped")
+            self._profiler = None
+            return function(*args)
+        try:
+            return function(*args)
+        finally:
+            profiler.disable()
+
+    @callback
+    def _async_profile_cycle_done(self, profiler):
+        if self._profiler is not profiler:
+            return
+        self._profile_cycles -= 1
+        if self._profile_cycles > 0:
+            return
+        self._profiler = None
+        self._hass.async_add_executor_job(self._save_profile, profiler, self._profile_path)
+
+    def _save_profile(self, profiler, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        profiler.dump_stats(path)
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        _LOGGER.info(f"Profile saved to {path}\n{output.getvalue()}")
+
     def _refresh_modbus_data(self, _now: Optional[int] = None) -> bool:
         """Time to update."""
         if not self._sensors:
@@ -84,10 +495,12 @@ class HomeHeatControl:
 
         if not self._check_and_reconnect():
             #if not connected, skip
+            self._stats["skipped_cycles"] += 1
             return False
 
         #check if readout is currently active
         if self._readout_active == True:
+            self._stats["skipped_cycles"] += 1
             return False
         
         #lock read modbus
@@ -108,14 +521,78 @@ class HomeHeatControl:
         """Return the name of this hub."""
         return self._name
 
+    @property
+    def profile(self):
+        """Return the compiled register profile."""
+        return self._profile
+
+    @property
+    def sensors(self):
+        """Return the entities registered at the hub."""
+        return self._sensors
+
+    def get_platform_entities(self, platform):
+        """Return the installed HHCEntityInfo records of one platform at the addresses of the register profile."""
+        registers = self._profile["registers"]
+        entities = []
+        for entity_info in get_platform_entities(platform, self._layout):
+            key = entity_info.description.key
+            if key not in registers or registers[key][1] is None or not self.is_installed(key):
+                continue
+            entities.append(entity_info._replace(slave=registers[key][0], address=registers[key][1]))
+        if platform == "sensor":
+            #registers only known to this firmware are exposed as plain sensors
+            for key, extra_sensor in self._profile["extra_sensors"].items():
+                description = SensorEntityDescription(
+                    name=extra_sensor["name"],
+                    key=key,
+                    state_class=SensorStateClass.MEASUREMENT if extra_sensor["unit"] else None,
+                    unit_of_measurement=extra_sensor["unit"],
+                )
+                entities.append(HHCEntityInfo(registers[key][0], registers[key][1], description))
+        return entities
+
+    def get_entity_info(self, key):
+        """Return the HHCEntityInfo of an installed entity key at its register profile address, None if there is none."""
+        if self._entity_infos is None:
+            registers = self._profile["registers"]
+            entity_infos = {}
+            for sensor_info in get_sensor_types(self._layout):
+                entity_info = HHCEntityInfo(*sensor_info)
+                entity_key = entity_info.description.key
+                register = registers.get(entity_key)
+                if register is not None and register[1] is not None and self.is_installed(entity_key):
+                    entity_infos[entity_key] = entity_info._replace(slave=register[0], address=register[1])
+            self._entity_infos = entity_infos
+        return self._entity_infos.get(key)
+
+    def _codec(self, key):
+        """Return (count, decoder) of an entity key, None if it is not polled."""
+        register = self._profile["registers"].get(key)
+        if register is None or register[1] is None or register[2] is None:
+            return None
+        return CODECS[register[2]]
+
+    def is_installed(self, key: str) -> bool:
+        """Return False if the entity key belongs to a subsystem the hardware discovery did not find."""
+        if self._installed_subsystems is None:
+            return True
+        for subsystem in get_subsystems(self._layout):
+            if key.startswith(f"{subsystem}_") and subsystem not in self._installed_subsystems:
+                return False
+        return True
+
     def close(self):
         """Disconnect client."""
         with self._lock:
             self._client.close()
+            if self._trace is not None:
+                self._trace.close()
 
     def _check_and_reconnect(self):
         if not self._client.connected:
             _LOGGER.info("modbus client is not connected, trying to reconnect")
+            self._stats["reconnects"] += 1
             return self.connect()
         return self._client.connected
 
@@ -134,28 +611,300 @@ class HomeHeatControl:
         return result
     
 
+    def get_diagnostics(self):
+        """Return the register image, read plan, tiers, block errors and recent cycles for the diagnostics download."""
+        image = []
+        for slave, address in sorted(self._registers):
+            value = self._registers[(slave, address)]
+            if image and image[-1]["slave"] == slave and image[-1]["address"] + image[-1]["count"] == address:
+                image[-1]["count"] += 1
+                image[-1]["hex"] += f"{value:04x}"
+            else:
+                image.append({"slave": slave, "address": address, "count": 1, "hex": f"{value:04x}"})
+
+        def tier_registers(tier):
+            return [f"{slave}:{address}" for slave, address in sorted(tier)]
+
+        return {
+            "profile": {"id": self._profile["id"], "read_plan": self._profile["read_plan"]},
+            #None until the next cycle rebuilds a plan invalidated by pruning
+            "read_plan": [list(block) for block in self._read_plan] if self._read_plan is not None else None,
+            "tiers": {
+                "polled": tier_registers(self._polled_registers),
+                "sentinel": tier_registers(self._sentinel_registers),
+                "slow": {f"{slave}:{address}": pruned for (slave, address), pruned in sorted(self._pruned.items())},
+                "dtc_status": tier_registers(self._dtc_registers),
+            },
+            "readwrite_supported": self._readwrite_supported,
+            "register_image": image,
+            "block_errors": [
+                {"slave": slave, "address": start, "count": count, "errors": errors, "last_exception_code": exception_code}
+                for (slave, start, count), (errors, exception_code) in sorted(self._block_errors.items())
+            ],
+            "statistics": self.diagnostics,
+            "recent_cycles": [
+                {"start": datetime.fromtimestamp(start).isoformat(), "duration": duration, "transactions": transactions, "registers": registers}
+                for start, duration, transactions, registers in list(self._cycle_timings)
+            ],
+        }
+
+    @property
+    def metrics(self):
+        """Return the counters of the metrics endpoint: hub statistics, cycle time histogram and the transaction tracer."""
+        return self.diagnostics, self._cycle_histogram, self._latency
+
+    @property
+    def latency(self):
+        """Return the transaction latency histograms and spans."""
+        return self._latency.dump()
+
+    def _execute(self, function_code, unit, address, count, request, start):
+        """Run a client request with the lock held, counts it and records its latency since start."""
+        locked = time.perf_counter()
+        self._stats["lock_wait"] += locked - start
+        self._stats["transactions"] += 1
+        response = None
+        try:
+            response = request()
+        finally:
+            self._latency.record(function_code, unit, address, count, start, locked, response)
+        return response
+
     def read_holding_registers(self, unit, address, count):
         """Read holding registers."""
+        start = time.perf_counter()
         with self._lock:
-            return self._client.read_holding_registers(
-                address=address, count=count, slave=unit
+            return self._execute(
+                READ_HOLDING_REGISTERS, unit, address, count,
+                lambda: self._client.read_holding_registers(address=address, count=count, slave=unit),
+                start,
             )
 
     def write_registers(self, unit, address, payload):
         """Write registers."""
+        start = time.perf_counter()
         with self._lock:
-            return self._client.write_registers(
-                address=address, values=payload, slave=unit
+            return self._execute(
+                WRITE_MULTIPLE_REGISTERS, unit, address, len(payload),
+                lambda: self._client.write_registers(address=address, values=payload, slave=unit),
+                start,
             )
             
+    async def async_write_registers(self, unit, address, payload):
+        """Write registers and read them back, the confirmed values update the register image and the entities decoded from them.
+
+        Returns the confirmed values, None if the write failed.
+        """
+        self._stats["write_queue"] += 1
+        try:
+            registers = await self._hass.async_add_executor_job(self._write_registers_verified, unit, address, payload)
+        finally:
+            self._stats["write_queue"] -= 1
+        if registers is not None:
+            self._async_apply_registers(unit, address, registers)
+            self._async_schedule_followup(unit, address, len(payload))
+        return registers
+
+    async def async_write_register_values(self, values):
+        """Write {(slave, address): raw value} with one transaction per contiguous range, returns the addresses of the ranges that failed."""
+        ranges = []
+        for slave, address in sorted(values):
+            if ranges and ranges[-1][0] == slave and ranges[-1][1] + len(ranges[-1][2]) == address and len(ranges[-1][2]) < MODBUS_MAX_WRITE_COUNT:
+                ranges[-1][2].append(values[(slave, address)])
+            else:
+                ranges.append([slave, address, [values[(slave, address)]]])
+
+        self._stats["write_queue"] += len(ranges)
+        try:
+            results = await self._hass.async_add_executor_job(
+                lambda: [self._write_registers_verified(slave, address, payload) for slave, address, payload in ranges]
+            )
+        finally:
+            self._stats["write_queue"] -= len(ranges)
+        failed = []
+        for (slave, address, payload), registers in zip(ranges, results):
+            if registers is None:
+                failed.append(address)
+                continue
+            self._async_apply_registers(slave, address, registers)
+            self._async_schedule_followup(slave, address, len(payload))
+        _LOGGER.debug(f"Wrote {len(values)} registers in {len(ranges)} transactions, failed: {failed}")
+        return failed
+
+    def _write_registers_verified(self, unit, address, payload):
+        """Write with readback in one transaction (FC23), falls back to write plus block read if the controller rejects FC23"""
+        if not self._check_and_reconnect():
+            return None
+        start = time.perf_counter()
+        with self._lock:
+            if self._readwrite_supported is not False:
+                response = self._execute(
+                    READWRITE_MULTIPLE_REGISTERS, unit, address, len(payload),
+                    lambda: self._client.readwrite_registers(
+                        read_address=address, read_count=len(payload), write_address=address, values=payload, slave=unit
+                    ),
+                    start,
+                )
+                if not response.isError():
+                    self._readwrite_supported = True
+                    return response.registers
+                if getattr(response, "exception_code", None) != ExceptionResponse.ILLEGAL_FUNCTION:
+                    _LOGGER.debug(f"Read/write error at address:{address} count:{len(payload)}: {response}")
+                    return None
+                _LOGGER.info("Controller does not support read/write multiple registers, writing and reading back separately")
+                self._readwrite_supported = False
+                #the lock is already held
+                start = time.perf_counter()
+
+            response = self._execute(
+                WRITE_MULTIPLE_REGISTERS, unit, address, len(payload),
+                lambda: self._client.write_registers(address=address, values=payload, slave=unit),
+                start,
+            )
+            if response.isError():
+                return None
+            response = self._execute(
+                READ_HOLDING_REGISTERS, unit, address, len(payload),
+                lambda: self._client.read_holding_registers(address=address, count=len(payload), slave=unit),
+                time.perf_counter(),
+            )
+            if response.isError():
+                #written but not confirmed, the next cycle reads the real value
+                _LOGGER.debug(f"Readback error at address:{address} count:{len(payload)}")
+                return list(payload)
+            return response.registers
+
+    @callback
+    def _async_apply_registers(self, unit, address, registers):
+        """Put confirmed values into the register image and decode the entities mapped to them"""
+        timestamp = time.time()
+        written = set()
+        for offset, value in enumerate(registers):
+            register = (unit, address + offset)
+            self._registers[register] = value
+            self._register_timestamps[register] = timestamp
+            written.add(register)
+
+        for sensor in self._sensors:
+            codec = self._codec(sensor.entity_description.key)
+            if codec is None:
+                continue
+            count, decoder = codec
+            sensor_registers = [(sensor._slaveId, sensor._address + i) for i in range(count)]
+            if written.isdisjoint(sensor_registers) or not all(register in self._registers for register in sensor_registers):
+                continue
+            sensor._data = decoder([self._registers[register] for register in sensor_registers])
+            _modbus_data_updated = getattr(sensor, "_modbus_data_updated", None)
+            if callable(_modbus_data_updated):
+                sensor._modbus_data_updated()
+
+    @callback
+    def _async_schedule_followup(self, unit, address, count):
+        """Read the status registers depending on written registers WRITE_FOLLOWUP_DELAY seconds later, writes in between share one read"""
+        written = set((unit, address + offset) for offset in range(count))
+        for sensor in self._sensors:
+            if (sensor._slaveId, sensor._address) not in written:
+                continue
+            for dependent in self._write_dependencies.get(sensor.entity_description.key, []):
+                self._followup_registers.update(self._registers_by_key.get(dependent, []))
+        if self._followup_registers and self._unsub_followup is None:
+            self._unsub_followup = async_call_later(self._hass, WRITE_FOLLOWUP_DELAY, self._async_followup_read)
+
+    async def _async_followup_read(self, _now=None):
+        self._unsub_followup = None
+        registers, self._followup_registers = self._followup_registers, set()
+        await self._async_read_and_update(registers)
+
+    async def async_request_refresh(self, sensors):
+        """Read the registers of some entities right away.
+
+        Requests while a cycle is running are served by that cycle, concurrent requests share one read.
+        """
+        registers = set(
+            register
+            for sensor, _attribute, _decoder, sensor_registers in self._polled
+            if sensor in sensors
+            for register in sensor_registers
+        )
+        if self._cycle_running is not None:
+            registers.difference_update(await asyncio.shield(self._cycle_running))
+        if not registers:
+            return
+        self._refresh_registers.update(registers)
+        if self._refresh_task is None:
+            self._refresh_task = self._hass.async_create_task(self._async_refresh_requested())
+        await asyncio.shield(self._refresh_task)
+
+    async def _async_refresh_requested(self):
+        #let the requests of the same event loop iteration join
+        await asyncio.sleep(0)
+        registers, self._refresh_registers = self._refresh_registers, set()
+        self._refresh_task = None
+        await self._async_read_and_update(registers)
+
+    async def _async_read_exclusive(self, job, *args):
+        """Run an out-of-cycle read in the executor after the running cycle and reads, cycles starting meanwhile wait for it."""
+        while self._cycle_running is not None or self._read_running is not None:
+            await asyncio.shield(self._cycle_running or self._read_running)
+        read_running = self._read_running = asyncio.get_running_loop().create_future()
+        try:
+            return await self._hass.async_add_executor_job(job, *args)
+        finally:
+            self._read_running = None
+            read_running.set_result(None)
+
+    async def _async_read_and_update(self, registers):
+        updated = await self._async_read_exclusive(self._read_and_decode, registers)
+        for sensor in updated:
+            _modbus_data_updated = getattr(sensor, "_modbus_data_updated", None)
+            if callable(_modbus_data_updated):
+                sensor._modbus_data_updated()
+
+    def _read_and_decode(self, registers):
+        """targeted block read outside of the cycle, returns the entities that got new data"""
+        fresh = self._read_now(registers)
+        updated = []
+        for sensor, attribute, decoder, sensor_registers in self._polled:
+            if sensor_registers and all(register in fresh for register in sensor_registers):
+                setattr(sensor, attribute, decoder([self._registers[register] for register in sensor_registers]))
+                updated.append(sensor)
+        return updated
+
+    async def async_read_entity_registers(self, keys):
+        """Read the registers of entity keys right away, returns {key: raw value} of the keys that could be read."""
+        entity_infos = [entity_info for entity_info in map(self.get_entity_info, keys) if entity_info is not None]
+        fresh = await self._async_read_exclusive(
+            self._read_now, [(entity_info.slave, entity_info.address) for entity_info in entity_infos]
+        )
+        return {
+            entity_info.description.key: self._registers[(entity_info.slave, entity_info.address)]
+            for entity_info in entity_infos
+            if (entity_info.slave, entity_info.address) in fresh
+        }
+
+    def _read_now(self, registers):
+        """read registers outside of the cycle in as few blocks as possible, returns the registers read"""
+        fresh = set()
+        if not self._check_and_reconnect():
+            return fresh
+        try:
+            self._read_registers(registers, fresh)
+        except (BrokenPipeError, pymodbus.exceptions.ModbusIOException):
+            self.close()
+        return fresh
+
     def write_register(self, unit, address, payload):
         """Write register."""
+        start = time.perf_counter()
         with self._lock:
-            return self._client.write_register(
-                address=address, value=payload, slave=unit
+            return self._execute(
+                WRITE_SINGLE_REGISTER, unit, address, 1,
+                lambda: self._client.write_register(address=address, value=payload, slave=unit),
+                start,
             )
     
     def get_sensor_by_name(self, name: str):
+        """Return the registered entity for a key, None if it was not created."""
         for i in range(len(self._sensors)):
             try:
                 if name in self._sensors[i].entity_description.key:
@@ -166,570 +915,269 @@ class HomeHeatControl:
             
     def read_modbus_data(self):
         _LOGGER.debug("Modbus read Start")
-        result = False
+        cycle_start = time.perf_counter()
+        transactions, lock_wait = self._stats["transactions"], self._stats["lock_wait"]
+        if self._read_plan is None:
+            self._build_read_plan()
+
+        fresh = set()
         try:
-            result = (
-                self.read_modbus_data_sw_Version(),
-                self.read_modbus_data_bool(self.get_sensor_by_name("dtcactive")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("outsidetemperature")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("room1temperature")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("room2temperature")),
-                self.read_modbus_data_doorbellstatus(),
-                self.read_modbus_data_bool(self.get_sensor_by_name("heatcontrolmanagement_enabled")),
-                self.read_modbus_data_bool(self.get_sensor_by_name("heatcontrolmanagement_lowTemperatureWarning")),
-                self.read_modbus_data_hc_status(self.get_sensor_by_name("heatcircuit_1_status")),
-                self.read_modbus_data_pumpstatus(self.get_sensor_by_name("heatcircuit_1_pumpstatus")),
-                self.read_modbus_data_mixerstatus(self.get_sensor_by_name("heatcircuit_1_mixerstatus")),
-                self.read_modbus_data_bool(self.get_sensor_by_name("heatcircuit_1_mixernormed")),
-                self.read_modbus_data_mixerposition(self.get_sensor_by_name("heatcircuit_1_mixerposition")),
-                self.read_modbus_data_hc_targetforeruntemperature(self.get_sensor_by_name("heatcircuit_1_targetForerunTemperature")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("heatcircuit_1_forerunTemperature")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("heatcircuit_1_returnflowTemperature")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_1_mode_overwrite")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_1_timer_1_mode")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_1_timer_1_start")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_1_timer_1_stop")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_1_timer_2_mode")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_1_timer_2_start")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_1_timer_2_stop")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_1_curve_inclination")),
-                self.read_modbus_data_signed16bit(self.get_sensor_by_name("heatcircuit_1_curve_niveau")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_1_curve_targettemperature_day")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_1_curve_targettemperature_night")),
-                self.read_modbus_data_hc_status(self.get_sensor_by_name("heatcircuit_2_status")),
-                self.read_modbus_data_pumpstatus(self.get_sensor_by_name("heatcircuit_2_pumpstatus")),
-                self.read_modbus_data_mixerstatus(self.get_sensor_by_name("heatcircuit_2_mixerstatus")),
-                self.read_modbus_data_bool(self.get_sensor_by_name("heatcircuit_2_mixernormed")),
-                self.read_modbus_data_mixerposition(self.get_sensor_by_name("heatcircuit_2_mixerposition")),
-                self.read_modbus_data_hc_targetforeruntemperature(self.get_sensor_by_name("heatcircuit_2_targetForerunTemperature")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("heatcircuit_2_forerunTemperature")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("heatcircuit_2_returnflowTemperature")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_2_mode_overwrite")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_2_timer_1_mode")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_2_timer_1_start")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_2_timer_1_stop")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_2_timer_2_mode")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_2_timer_2_start")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_2_timer_2_stop")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_2_curve_inclination")),
-                self.read_modbus_data_signed16bit(self.get_sensor_by_name("heatcircuit_2_curve_niveau")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_2_curve_targettemperature_day")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_2_curve_targettemperature_night")),
-                self.read_modbus_data_hc_status(self.get_sensor_by_name("heatcircuit_3_status")),
-                self.read_modbus_data_pumpstatus(self.get_sensor_by_name("heatcircuit_3_pumpstatus")),
-                self.read_modbus_data_mixerstatus(self.get_sensor_by_name("heatcircuit_3_mixerstatus")),
-                self.read_modbus_data_bool(self.get_sensor_by_name("heatcircuit_3_mixernormed")),
-                self.read_modbus_data_mixerposition(self.get_sensor_by_name("heatcircuit_3_mixerposition")),
-                self.read_modbus_data_hc_targetforeruntemperature(self.get_sensor_by_name("heatcircuit_3_targetForerunTemperature")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("heatcircuit_3_forerunTemperature")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("heatcircuit_3_returnflowTemperature")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_3_mode_overwrite")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_3_timer_1_mode")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_3_timer_1_start")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_3_timer_1_stop")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_3_timer_2_mode")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_3_timer_2_start")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_3_timer_2_stop")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_3_curve_inclination")),
-                self.read_modbus_data_signed16bit(self.get_sensor_by_name("heatcircuit_3_curve_niveau")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_3_curve_targettemperature_day")),
-                self.read_modbus_data_unsigned16bit(self.get_sensor_by_name("heatcircuit_3_curve_targettemperature_night")),
-                self.read_modbus_data_bufferstorage_status(),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("bufferstorage_1_temperature_top")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("bufferstorage_1_temperature_middletop")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("bufferstorage_1_temperature_middlebottom")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("bufferstorage_1_temperature_bottom")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("bufferstorage_2_temperature_top")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("bufferstorage_2_temperature_middletop")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("bufferstorage_2_temperature_middlebottom")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("bufferstorage_2_temperature_bottom")),
-                self.read_modbus_data_mixerstatus(self.get_sensor_by_name("bufferstorage_charge_or_switch_mixerstatus")),
-                self.read_modbus_data_bool(self.get_sensor_by_name("bufferstorage_charge_or_switch_mixernormed")),
-                self.read_modbus_data_mixerposition(self.get_sensor_by_name("bufferstorage_charge_or_switch_mixerposition")),
-                self.read_modbus_data_pumpstatus(self.get_sensor_by_name("bufferstorage_chargepumpstatus")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("bufferstorage_chargewatertemperature")),
-                self.read_modbus_data_bufferstorage_filllevel(self.get_sensor_by_name("bufferstorage_1_filllevel")),
-                self.read_modbus_data_bufferstorage_filllevel(self.get_sensor_by_name("bufferstorage_2_filllevel")),
-                self.read_modbus_data_bufferstorage_filllevel(self.get_sensor_by_name("bufferstorage_combined_filllevel")),
-                self.read_modbus_data_bufferstorage_activestatus(),
-                self.read_modbus_data_valvestatus(self.get_sensor_by_name("bufferstorage_chargevalvestatus")),
-                self.read_modbus_data_bufferstorage_chargestatus(),
-                self.read_modbus_data_bool(self.get_sensor_by_name("bufferstorage_chargeElectricOnly")),
-                self.read_modbus_data_warmwater_boiler_status(),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("warmwater_boiler_temperature")),
-                self.read_modbus_data_pumpstatus(self.get_sensor_by_name("warmwater_boiler_chargepumpstatus")),
-                self.read_modbus_data_valvestatus(self.get_sensor_by_name("warmwater_boiler_valvestatus")),
-                self.read_modbus_data_bool(self.get_sensor_by_name("warmwater_bath_heatingactive")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("warmwater_circulation_outputtemperature")),
-                self.read_modbus_data_pumpstatus(self.get_sensor_by_name("warmwater_circulation_pumpstatus")),
-                self.read_modbus_data_warmwater_circulation_circuit_status(self.get_sensor_by_name("warmwater_circulation_circuit1_status")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("warmwater_circulation_circuit1_temperature")),
-                self.read_modbus_data_valvestatus(self.get_sensor_by_name("warmwater_circulation_circuit1_valvestatus")),
-                self.read_modbus_data_warmwater_circulation_circuit_status(self.get_sensor_by_name("warmwater_circulation_circuit2_status")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("warmwater_circulation_circuit2_temperature")),
-                self.read_modbus_data_valvestatus(self.get_sensor_by_name("warmwater_circulation_circuit2_valvestatus")),
-                self.read_modbus_data_woodburner_status(),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("woodburner_exhaust_temperature")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("woodburner_water_temperature")),
-                self.read_modbus_data_gasburner_status(),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("gasburner_exhaust_temperature")),
-                self.read_modbus_data_temperaturesensor_signed16bit(self.get_sensor_by_name("gasburner_water_temperature")),
-            )
+            for slave, start, count in self._read_plan:
+                members = [address for address in range(start, start + count) if (slave, address) in self._polled_registers]
+                self._read_block(slave, members, fresh)
+            if self._dtc_registers:
+                dtcactive = self._registers_by_key.get("dtcactive")
+                if dtcactive is not None and self._registers.get(dtcactive[0]) == 0:
+                    #no DTC is active, the status words are not read
+                    self._dtc_sensor._active_dtcs = []
+                else:
+                    self._read_registers(self._dtc_registers, fresh)
+            if self._slow_registers and (datetime.now() - self._last_revalidation).total_seconds() > PRUNED_REVALIDATE_INTERVAL:
+                self._revalidate_pruned_registers(fresh)
         except (BrokenPipeError, pymodbus.exceptions.ModbusIOException):
             self.close()
 
+        for sensor, attribute, decoder, registers in self._polled:
+            if all(register in fresh for register in registers):
+                setattr(sensor, attribute, decoder([self._registers[register] for register in registers]))
+
+        self._last_fresh = fresh
+        duration = time.perf_counter() - cycle_start
+        self._stats["cycle_duration"] = duration
+        self._stats["cycle_transactions"] = self._stats["transactions"] - transactions
+        self._stats["cycle_lock_wait"] = self._stats["lock_wait"] - lock_wait
+        self._stats["cycle_registers"] = len(fresh)
+        self._stats["cycles"] += 1
+        self._cycle_timings.append((time.time() - duration, duration, self._stats["cycle_transactions"], len(fresh)))
+        self._cycle_histogram.observe(duration)
+        if duration > self._scan_interval.total_seconds():
+            self._stats["overrun_cycles"] += 1
         _LOGGER.debug("Modbus read End")
-        return result
-
-    def read_modbus_data_sw_Version(self):
-        """start reading data"""
-        sensor_fbl = self.get_sensor_by_name("fbl_sw_version")
-        sensor_appl = self.get_sensor_by_name("appl_sw_version")
-        data_package = self.read_holding_registers(unit=sensor_fbl._slaveId, address=sensor_fbl._address, count=4)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor_fbl._address} Name:{sensor_fbl.entity_description.key}')
-            return False
-        value = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT64)
-        
-        fbl_sw_version_major = value >> 56
-        fbl_sw_version_minor = (value >> 48) & 0xFF
-        fbl_sw_version_patch = (value >> 40) & 0xFF
-        appl_sw_version_major = (value >> 32) & 0xFF
-        appl_sw_version_minor = (value >> 24) & 0xFF
-        appl_sw_version_patch = (value >> 16) & 0xFF
-
-        sensor_fbl._data = f"{fbl_sw_version_major}.{fbl_sw_version_minor}.{fbl_sw_version_patch}"
-        sensor_appl._data = f"{appl_sw_version_major}.{appl_sw_version_minor}.{appl_sw_version_patch}"
-        
-        return True
-    
-    def read_modbus_data_bool(self, sensor):
-        """start reading data"""
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-        
-        sensor._data = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16) != 0
-
-        return True
-    
-    def read_modbus_data_unsigned16bit(self, sensor):
-        """start reading data"""
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-        
-        sensor._data = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        return True
-    
-    def read_modbus_data_signed16bit(self, sensor):
-        """start reading data"""
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-        
-        sensor._data = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.INT16)
-
-        return True
-    
-    def read_modbus_data_temperaturesensor_signed16bit(self, sensor):
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        temperature_raw = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.INT16)
-
-        if temperature_raw == 0x7FFD:
-            sensor._data = "Nicht verbaut"
-        elif temperature_raw == 0x7FFE:
-            sensor._data = "Init"
-        elif temperature_raw == 0x7FFF:
-            sensor._data = "Fehler"
-        else:
-            sensor._data = temperature_raw/10
-        
-        return True
-
-    def read_modbus_data_pumpstatus(self, sensor):
-        """start reading data"""
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        status = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if status == 0:
-            sensor._data = "Nicht verbaut"
-        elif status == 1:
-            sensor._data = "Aus"
-        elif status == 2:
-            sensor._data = "An"
-        elif status == 3:
-            sensor._data = "Fehler"
-        else:
-            sensor._data = None
-        
-        return True
-
-    def read_modbus_data_mixerstatus(self, sensor):
-        """start reading data"""
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        status = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if status == 0:
-            sensor._data = "Nicht verbaut"
-        elif status == 1:
-            sensor._data = "Aus"
-        elif status == 2:
-            sensor._data = "Normierung"
-        elif status == 3:
-            sensor._data = "Öffen - Langsam"
-        elif status == 4:
-            sensor._data = "Öffnen - Schnell"
-        elif status == 5:
-            sensor._data = "Schließen - Langsam"
-        elif status == 6:
-            sensor._data = "Schließen - Schnell"
-        elif status == 7:
-            sensor._data = "Fehler"
-        else:
-            sensor._data = None
-        
-        return True
-
-    def read_modbus_data_mixerposition(self, sensor):
-        """start reading data"""
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        position = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if position > 100:
-            sensor._data = None
-        else:
-            sensor._data = position
-        
-        return True
-
-    def read_modbus_data_valvestatus(self, sensor):
-        """start reading data"""
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
+        return len(fresh) > 0
+
+    def _build_read_plan(self):
+        """assign the registers of all polled entities to read blocks, pruned registers go to the slow tier and the DTC status words to their own read"""
+        polled = []
+        registers_by_key = {}
+        #register: raw value meaning the hardware is not installed
+        sentinel_registers = {}
+        dtc_status = self._profile.get(DTC_STATUS_KEY)
+        dtc_sensor = None
+        for sensor in list(self._sensors):
+            codec = self._codec(sensor.entity_description.key)
+            if codec is None:
+                continue
+            count, decoder = codec
+            registers = [(sensor._slaveId, sensor._address + i) for i in range(count)]
+            polled.append((sensor, "_data", decoder, registers))
+            registers_by_key[sensor.entity_description.key] = registers
+            sentinel = SENTINEL_VALUES.get(self._profile["registers"][sensor.entity_description.key][2])
+            if sentinel is not None:
+                sentinel_registers[registers[0]] = sentinel
+            if sensor.entity_description.key == "dtcactive" and dtc_status is not None:
+                #the DTC status words are decoded into an attribute of dtcactive
+                dtc_slave, dtc_address, dtc_count = dtc_status
+                registers = [(dtc_slave, dtc_address + i) for i in range(dtc_count)]
+                polled.append((sensor, "_active_dtcs", decode_dtcs, registers))
+                registers_by_key[DTC_STATUS_KEY] = registers
+                dtc_sensor = sensor
+
+        polled_registers = set(register for registers in registers_by_key.values() for register in registers)
+        barriers = {}
+        for (slave, address), pruned in self._pruned.items():
+            #sentinel registers are readable and may be bridged, illegal ones and failed gaps not
+            if pruned["reason"] != "sentinel":
+                barriers.setdefault(slave, set()).add(address)
+
+        hot = {}
+        slow_registers = set()
+        dtc_registers = set(registers_by_key.get(DTC_STATUS_KEY, ()))
+        for slave, address in polled_registers:
+            if (slave, address) in self._pruned:
+                slow_registers.add((slave, address))
+            elif (slave, address) in dtc_registers:
+                #read after the hot blocks, only while dtcactive is set
+                continue
+            else:
+                hot.setdefault(slave, set()).add(address)
+
+        read_plan = []
+        for slave in sorted(hot):
+            for start, count in plan_blocks(hot[slave], barriers=barriers.get(slave, ())):
+                read_plan.append((slave, start, count))
+        #DTC status words bridged inside a hot block are decoded from it every cycle
+        dtc_registers = sorted(
+            (slave, address) for slave, address in dtc_registers
+            if (slave, address) not in self._pruned
+            and not any(block_slave == slave and start <= address < start + count for block_slave, start, count in read_plan)
+        )
+
+        self._polled = polled
+        self._polled_registers = polled_registers
+        self._sentinel_registers = sentinel_registers
+        self._registers_by_key = registers_by_key
+        self._barriers = barriers
+        self._slow_registers = slow_registers
+        self._dtc_sensor = dtc_sensor
+        self._dtc_registers = dtc_registers
+        self._read_plan = read_plan
+        _LOGGER.debug(f"Read plan: {read_plan}, slow tier: {sorted(slow_registers)}")
+
+    def _read_registers(self, registers, fresh):
+        """read a set of polled registers outside of the hot plan"""
+        addresses = {}
+        for slave, address in registers:
+            if (slave, address) not in fresh:
+                addresses.setdefault(slave, set()).add(address)
+        for slave, slave_addresses in addresses.items():
+            for start, count in plan_blocks(slave_addresses, barriers=self._barriers.get(slave, ())):
+                members = [address for address in range(start, start + count) if address in slave_addresses]
+                self._read_block(slave, members, fresh)
+
+    def _read_block(self, slave, members, fresh):
+        """read the block spanning the given polled addresses into the register image, returns True if it was read completely"""
+        start = members[0]
+        count = members[-1] - members[0] + 1
+        data_package = self.read_holding_registers(unit=slave, address=start, count=count)
+        if not data_package.isError():
+            self._store_registers(slave, start, data_package.registers, fresh)
+            return True
+
+        _LOGGER.debug(f'Data error at start address:{start} count:{count}')
+        self._stats["failed_blocks"] += 1
+        block_errors = self._block_errors.setdefault((slave, start, count), [0, None])
+        block_errors[0] += 1
+        block_errors[1] = getattr(data_package, "exception_code", None)
+        if block_errors[1] != ExceptionResponse.ILLEGAL_ADDRESS:
             return False
-
-        status = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if status == 0:
-            sensor._data = "Nicht verbaut"
-        elif status == 1:
-            sensor._data = "Entnormiert"
-        elif status == 2:
-            sensor._data = "Offen"
-        elif status == 3:
-            sensor._data = "Öffnen"
-        elif status == 4:
-            sensor._data = "Geschlossen"
-        elif status == 5:
-            sensor._data = "Schließen"
-        elif status == 6:
-            sensor._data = "Fehler"
-        else:
-            sensor._data = None
-        
-        return True
-
-    def read_modbus_data_hc_status(self, sensor):
-        """start reading data"""
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
+        if len(members) == 1:
+            self._prune_register((slave, start), "illegal")
             return False
 
-        status = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if status == 0:
-            sensor._data = "Nicht verbaut"
-        elif status == 1:
-            sensor._data = "Aus - Manuell"
-        elif status == 2:
-            sensor._data = "Aus - Timer"
-        elif status == 3:
-            sensor._data = "Nachtbetrieb - Manuell"
-        elif status == 4:
-            sensor._data = "Nachtbetrieb - Timer"
-        elif status == 5:
-            sensor._data = "Tagbetrieb - Manuell"
-        elif status == 6:
-            sensor._data = "Tagbetrieb - Timer"
-        elif status == 7:
-            sensor._data = "Fehler"
-        else:
-            sensor._data = None
-        
-        return True
-
-    def read_modbus_data_hc_targetforeruntemperature(self, sensor):
-        """at the moment the datahandling is the same as for the mixer position"""
-        return self.read_modbus_data_mixerposition(sensor)
+        #bisect the block to find the illegal registers, the next plan splits the block around them
+        half = len(members) // 2
+        left = self._read_block(slave, members[:half], fresh)
+        right = self._read_block(slave, members[half:], fresh)
+        if left and right:
+            #both halves are readable, so the bridged gap between them is not mapped
+            for address in range(members[half - 1] + 1, members[half]):
+                self._prune_register((slave, address), "gap")
+        return False
+
+    def _store_registers(self, slave, start, registers, fresh):
+        """put raw values into the register image and track registers reporting sentinel values"""
+        timestamp = time.time()
+        for offset, value in enumerate(registers):
+            register = (slave, start + offset)
+            self._registers[register] = value
+            self._register_timestamps[register] = timestamp
+            fresh.add(register)
+            if value == self._sentinel_registers.get(register):
+                self._sentinel_counts[register] = self._sentinel_counts.get(register, 0) + 1
+                if self._sentinel_counts[register] >= SENTINEL_PRUNE_CYCLES and register not in self._pruned:
+                    self._prune_register(register, "sentinel")
+            elif register in self._sentinel_counts or register in self._pruned:
+                #also promotes registers pruned as sentinel by an older map that are no sentinel registers anymore
+                self._sentinel_counts.pop(register, None)
+                if register in self._pruned and self._pruned[register]["reason"] == "sentinel":
+                    self._promote_register(register)
+
+    def _revalidate_pruned_registers(self, fresh):
+        """read the slow tier one by one, registers that came back are promoted to the hot plan again"""
+        self._last_revalidation = datetime.now()
+        for register in sorted(self._slow_registers):
+            if register in fresh:
+                continue
+            slave, address = register
+            data_package = self.read_holding_registers(unit=slave, address=address, count=1)
+            if data_package.isError():
+                continue
+            if register in self._pruned and self._pruned[register]["reason"] != "sentinel":
+                self._promote_register(register)
+            self._store_registers(slave, address, data_package.registers, fresh)
+
+    def _prune_register(self, register, reason):
+        _LOGGER.info(f"Register {register[1]} (slave {register[0]}) moved to slow tier: {reason}")
+        self._pruned[register] = {"reason": reason, "since": datetime.now().isoformat()}
+        self._register_map_changed = True
+        self._read_plan = None
+
+    def _promote_register(self, register):
+        _LOGGER.info(f"Register {register[1]} (slave {register[0]}) moved back to the read plan")
+        self._pruned.pop(register, None)
+        self._register_map_changed = True
+        self._read_plan = None
+
+    async def async_load_register_map(self):
+        """Restore the learned register map of a previous run."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        for pruned in data.get("pruned", []):
+            self._pruned[(pruned["slave"], pruned["address"])] = {"reason": pruned["reason"], "since": pruned["since"]}
+        self._read_plan = None
 
-    def read_modbus_data_doorbellstatus(self):
-        """start reading data"""
-        sensor = self.get_sensor_by_name("doorbell_status")
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        doorbellstatus = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if doorbellstatus == 0:
-            sensor._data = "Nicht verbaut"
-        elif doorbellstatus == 1:
-            sensor._data = "Aus"
-        elif doorbellstatus == 2:
-            sensor._data = "An"
-        elif doorbellstatus == 3:
-            sensor._data = "Fehler"
-        else:
-            sensor._data = None
-        
-        return True
-
-    def read_modbus_data_bufferstorage_status(self):
-        """start reading data"""
-        sensor = self.get_sensor_by_name("bufferstorage_status")
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        status = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if status == 0:
-            sensor._data = "Nicht verbaut"
-        elif status == 1:
-            sensor._data = "OK"
-        elif status == 2:
-            sensor._data = "Kodierfehler"
-        elif status == 3:
-            sensor._data = "Temperatursensorfehler"
-        elif status == 4:
-            sensor._data = "Externer Fehler"
-        else:
-            sensor._data = None
-        
-        return True
-
-    def read_modbus_data_bufferstorage_filllevel(self, sensor):
-        """start reading data"""
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        filllevel = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if filllevel == 0xFFFE:
-            sensor._data = "Nicht verbaut"
-        elif filllevel == 0xFFFF:
-            sensor._data = "Ungültig"
-        else:
-            sensor._data = filllevel/10
-        
-        return True
-
-    def read_modbus_data_bufferstorage_activestatus(self):
-        """start reading data"""
-        sensor = self.get_sensor_by_name("bufferstorage_active_status")
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        status = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if status == 0:
-            sensor._data = "Nicht verfügbar"
-        elif status == 1:
-            sensor._data = "Pufferspeicher 1"
-        elif status == 2:
-            sensor._data = "Pufferspeicher 2"
-        elif status == 3:
-            sensor._data = "Beide parallel"
-        else:
-            sensor._data = None
-        
-        return True
-
-    def read_modbus_data_bufferstorage_chargestatus(self):
-        """start reading data"""
-        sensor = self.get_sensor_by_name("bufferstorage_chargestatus")
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        status = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if status == 0:
-            sensor._data = "Nicht verfügbar"
-        elif status == 1:
-            sensor._data = "Nicht aktiv"
-        elif status == 2:
-            sensor._data = "Aktiv"
-        elif status == 3:
-            sensor._data = "Überladen aktiv"
-        elif status == 4:
-            sensor._data = "Vollständig überladen"
-        elif status == 5:
-            sensor._data = "Angefordert"
-        elif status == 6:
-            sensor._data = "Nachlauf"
-        elif status == 7:
-            sensor._data = "Fehler Temperatursensor"
-        elif status == 8:
-            sensor._data = "Fehler Extern"
-        elif status == 9:
-            sensor._data = "Fehler Kodierung"
-        else:
-            sensor._data = None
-        
-        return True
-
-    def read_modbus_data_warmwater_boiler_status(self):
-        """start reading data"""
-        sensor = self.get_sensor_by_name("warmwater_boiler_status")
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        status = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if status == 0:
-            sensor._data = "Nicht verfügbar"
-        elif status == 1:
-            sensor._data = "Aus"
-        elif status == 2:
-            sensor._data = "manuelles laden"
-        elif status == 3:
-            sensor._data = "automatisches laden"
-        elif status == 4:
-            sensor._data = "laden wird beendet"
-        elif status == 5:
-            sensor._data = "Fehler: Ladevorgang Zeitüberschreitung"
-        elif status == 6:
-            sensor._data = "Fehler"
-        else:
-            sensor._data = None
-        
-        return True
-
-    def read_modbus_data_warmwater_circulation_circuit_status(self, sensor):
-        """start reading data"""
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        status = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if status == 0:
-            sensor._data = "Nicht verbaut"
-        elif status == 1:
-            sensor._data = "Aus"
-        elif status == 2:
-            sensor._data = "An"
-        elif status == 3:
-            sensor._data = "Fehler Kodierung"
-        elif status == 4:
-            sensor._data = "Fehler Temperatursensor"
-        elif status == 5:
-            sensor._data = "Fehler Pumpe oder Ventil"
-        elif status == 6:
-            sensor._data = "Fehler Extern"
-        elif status == 7:
-            sensor._data = "Fehler Pufferspeicher unter Mindesttemperatur"
-        else:
-            sensor._data = None
-        
-        return True
-
-    def read_modbus_data_woodburner_status(self):
-        """start reading data"""
-        sensor = self.get_sensor_by_name("woodburner_status")
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
-
-        status = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if status == 0:
-            sensor._data = "Nicht verfügbar"
-        elif status == 1:
-            sensor._data = "Aus"
-        elif status == 2:
-            sensor._data = "Pumpe aktiv"
-        elif status == 3:
-            sensor._data = "Brand Startphase"
-        elif status == 4:
-            sensor._data = "Brand Startphase fehlgeschlagen"
-        elif status == 5:
-            sensor._data = "Brennt"
-        elif status == 6:
-            sensor._data = "Brennvorgang beendet"
-        elif status == 7:
-            sensor._data = "Fehler - Stromversorgung unterbrochen"
-        elif status == 8:
-            sensor._data = "Fehler"
-        else:
-            sensor._data = None
-        
-        return True
+    @callback
+    def _async_save_register_map(self):
+        if self._store is None:
+            return
+        data = {
+            "pruned": [
+                {"slave": slave, "address": address, "reason": pruned["reason"], "since": pruned["since"]}
+                for (slave, address), pruned in list(self._pruned.items())
+            ]
+        }
+        self._store.async_delay_save(lambda: data, REGISTER_MAP_SAVE_DELAY)
+
+    async def async_load_snapshot(self):
+        """Restore the register image of a previous run so entities start with the last known values."""
+        data = await self._snapshot_store.async_load()
+        if not data:
+            return
+        oldest = time.time() - SNAPSHOT_MAX_AGE
+        for slave, address, value, timestamp in data.get("registers", []):
+            if timestamp > oldest:
+                self._registers[(slave, address)] = value
+                self._register_timestamps[(slave, address)] = timestamp
+        if self._registers:
+            #stale but valid, entities stay available until the controller answers or the modbus timeout passes
+            self._last_data_received_timestamp = datetime.now()
+            _LOGGER.debug(f"Restored {len(self._registers)} registers from snapshot")
 
-    def read_modbus_data_gasburner_status(self):
-        """start reading data"""
-        sensor = self.get_sensor_by_name("gasburner_status")
-        data_package = self.read_holding_registers(unit=sensor._slaveId, address=sensor._address, count=1)      
-        if data_package.isError():
-            _LOGGER.debug(f'Data error at start address:{sensor._address} Name:{sensor.entity_description.key}')
-            return False
+    @callback
+    def _async_restore_sensor(self, sensor):
+        """Decode the restored register image for a newly added entity."""
+        codec = self._codec(sensor.entity_description.key)
+        if codec is None:
+            return
+        count, decoder = codec
+        registers = [(sensor._slaveId, sensor._address + i) for i in range(count)]
+        if all(register in self._registers for register in registers):
+            sensor._data = decoder([self._registers[register] for register in registers])
 
-        status = self._client.convert_from_registers(data_package.registers, self._client.DATATYPE.UINT16)
-
-        if status == 0:
-            sensor._data = "Nicht verfügbar"
-        elif status == 1:
-            sensor._data = "Aus"
-        elif status == 2:
-            sensor._data = "Pumpe aktiv"
-        elif status == 3:
-            sensor._data = "Brand Startphase"
-        elif status == 4:
-            sensor._data = "Brand Startphase fehlgeschlagen"
-        elif status == 5:
-            sensor._data = "Brennt"
-        elif status == 6:
-            sensor._data = "Brennvorgang beendet"
-        elif status == 7:
-            sensor._data = "Fehler - Stromversorgung unterbrochen"
-        elif status == 8:
-            sensor._data = "Fehler"
-        else:
-            sensor._data = None
-        
-        return True
\ No newline at end of file
+    @callback
+    def _async_check_firmware_version(self):
+        """Report a changed application firmware version, it may need another register profile."""
+        registers = self._registers_by_key.get(CONF_APPL_SW_VERSION)
+        if not registers or not all(register in self._registers for register in registers):
+            return
+        appl_sw_version = decode_appl_sw_version([self._registers[register] for register in registers])
+        if appl_sw_version == self._appl_sw_version:
+            return
+        _LOGGER.info(f"Application firmware version {self._appl_sw_version} -> {appl_sw_version}")
+        self._appl_sw_version = appl_sw_version
+        if self._on_firmware_change is not None:
+            self._hass.async_create_task(self._on_firmware_change(appl_sw_version))
+
+    async def async_save_snapshot(self, _event=None):
+        """Persist the register image, called on shutdown and unload."""
+        if self._snapshot_store is not None and self._registers:
+            await self._snapshot_store.async_save(self._snapshot_data())
+
+    def _snapshot_data(self):
+        return {
+            "registers": [
+                [slave, address, value, self._register_timestamps.get((slave, address), 0)]
+                for (slave, address), value in list(self._registers.items())
+            ]
+        }
@@ -0,0 +1,132 @@
+"""Latency histograms and spans of the Modbus transactions of a hub.
+
+Every transaction is split into three phases:
+
+    lock     waiting for the hub lock, e.g. behind a write or a block read
+    send     from the lock until the first bytes of the response arrived,
+             encoding, sending and the response time of the controller
+    receive  from the first bytes until the response is decoded
+
+Each phase goes into a histogram with fixed buckets per function code and
+block (unit id, address, count) and, for the metrics endpoint, per function
+code. The last transactions can be kept as spans with their outcome.
+"""
+import bisect
+import time
+from collections import deque
+
+#function codes of the hub transactions
+READ_HOLDING_REGISTERS = 3
+WRITE_SINGLE_REGISTER = 6
+WRITE_MULTIPLE_REGISTERS = 16
+READWRITE_MULTIPLE_REGISTERS = 23
+
+PHASES = ("lock", "send", "receive")
+#upper bounds in seconds, the last bucket takes everything above
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10)
+
+
+class LatencyHistogram:
+    """Counts per bucket of LATENCY_BUCKETS plus the overflow, the sum in seconds"""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def as_dict(self):
+        return {"count": self.count, "sum": self.sum, "counts": list(self.counts)}
+
+
+def _outcome(response):
+    if response is None:
+        return "failed"
+    if response.isError():
+        return f"exception {getattr(response, 'exception_code', None)}"
+    return "ok"
+
+
+class TransactionTracer:
+    """Records the phases of the transactions of one client, trace_packet is passed to the client"""
+
+    def __init__(self, spans=0):
+        #(function code, unit id, address, count): histogram per phase
+        self.histograms = {}
+        #function code: histogram per phase of all blocks
+        self.totals = {}
+        self.spans = deque(maxlen=spans) if spans else None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._first_response = None
+        self._response_bytes = 0
+
+    def trace_packet(self, sending, data):
+        if sending:
+            self.bytes_sent += len(data)
+            self._first_response = None
+            self._response_bytes = 0
+        else:
+            if self._first_response is None:
+                self._first_response = time.perf_counter()
+            #the client passes everything received so far for this response
+            self._response_bytes = len(data)
+        return data
+
+    def record(self, function_code, unit, address, count, start, locked, response):
+        """Record a transaction that waited for the lock from start until locked, called with the hub lock held."""
+        end = time.perf_counter()
+        received = self._first_response or end
+        self._first_response = None
+        self.bytes_received += self._response_bytes
+        self._response_bytes = 0
+        durations = (locked - start, received - locked, end - received)
+
+        key = (function_code, unit, address, count)
+        histograms = self.histograms.get(key)
+        if histograms is None:
+            histograms = self.histograms[key] = tuple(LatencyHistogram() for _phase in PHASES)
+        totals = self.totals.get(function_code)
+        if totals is None:
+            totals = self.totals[function_code] = tuple(LatencyHistogram() for _phase in PHASES)
+        for histogram, total, duration in zip(histograms, totals, durations):
+            histogram.observe(duration)
+            total.observe(duration)
+
+        if self.spans is not None:
+            self.spans.append((time.time(), function_code, unit, address, count, *durations, _outcome(response)))
+
+    def dump(self):
+        """Return the histograms and spans, durations in seconds."""
+        histograms = []
+        for (function_code, unit, address, count), phases in list(self.histograms.items()):
+            histograms.append({
+                "function_code": function_code,
+                "unit": unit,
+                "address": address,
+                "count": count,
+                **{phase: histogram.as_dict() for phase, histogram in zip(PHASES, phases)},
+            })
+        spans = None
+        if self.spans is not None:
+            spans = [
+                {
+                    "time": timestamp,
+                    "function_code": function_code,
+                    "unit": unit,
+                    "address": address,
+                    "count": count,
+                    "lock": lock,
+                    "send": send,
+                    "receive": receive,
+                    "outcome": outcome,
+                }
+                for timestamp, function_code, unit, address, count, lock, send, receive, outcome in list(self.spans)
+            ]
+        return {"buckets": list(LATENCY_BUCKETS), "histograms": histograms, "spans": spans}
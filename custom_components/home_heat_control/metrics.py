@@ -0,0 +1,106 @@
+"""Hub counters and latency histograms in the Prometheus text exposition format.
+
+    GET /api/home_heat_control/metrics   with a long-lived access token as bearer
+
+Every hub keeps its counters up to date while polling, a scrape only
+formats them. The samples of a hub carry its config entry name as label
+entry, the transaction histograms also the function code and phase.
+"""
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .latency import LATENCY_BUCKETS, PHASES
+
+METRICS_URL = "/api/home_heat_control/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "home_heat_control"
+
+#hub statistic: metric name, type, help
+COUNTERS = {
+    "cycles": ("cycles_total", "counter", "Completed poll cycles"),
+    "skipped_cycles": ("skipped_cycles_total", "counter", "Poll cycles skipped while disconnected or busy"),
+    "overrun_cycles": ("overrun_cycles_total", "counter", "Poll cycles longer than the scan interval"),
+    "failed_blocks": ("failed_blocks_total", "counter", "Block reads answered with an error"),
+    "reconnects": ("reconnects_total", "counter", "Connection attempts after the connection was lost"),
+    "transactions": ("transactions_total", "counter", "Modbus transactions"),
+    "lock_wait": ("lock_wait_seconds_total", "counter", "Time transactions waited for the hub lock"),
+    "write_queue": ("write_queue", "gauge", "Writes waiting for the hub"),
+    "data_age": ("data_age_seconds", "gauge", "Age of the last received data"),
+}
+
+
+def _escape(value):
+    """escape a label value as the text format requires, entry names are user input"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _histogram(lines, name, histogram, labels):
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS, histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+def render_metrics(hubs):
+    """Return the exposition of the hubs by entry name."""
+    lines = []
+    samples = {key: [] for key in COUNTERS}
+    sent, received, cycle_histograms, transaction_histograms = [], [], [], []
+    for entry, hub in hubs.items():
+        statistics, cycle_histogram, tracer = hub.metrics
+        for key, values in samples.items():
+            if statistics[key] is not None:
+                values.append((entry, statistics[key]))
+        sent.append((entry, tracer.bytes_sent))
+        received.append((entry, tracer.bytes_received))
+        cycle_histograms.append((entry, cycle_histogram))
+        for function_code, phases in list(tracer.totals.items()):
+            for phase, histogram in zip(PHASES, phases):
+                transaction_histograms.append(({"entry": entry, "function_code": function_code, "phase": phase}, histogram))
+
+    for key, (name, metric_type, description) in COUNTERS.items():
+        lines.append(f"# HELP {PREFIX}_{name} {description}")
+        lines.append(f"# TYPE {PREFIX}_{name} {metric_type}")
+        lines.extend(f"{PREFIX}_{name}{_labels(entry=entry)} {value}" for entry, value in samples[key])
+    for name, description, values in (
+        ("sent_bytes_total", "Bytes sent to the controller", sent),
+        ("received_bytes_total", "Bytes received from the controller", received),
+    ):
+        lines.append(f"# HELP {PREFIX}_{name} {description}")
+        lines.append(f"# TYPE {PREFIX}_{name} counter")
+        lines.extend(f"{PREFIX}_{name}{_labels(entry=entry)} {value}" for entry, value in values)
+
+    lines.append(f"# HELP {PREFIX}_cycle_duration_seconds Duration of the poll cycles")
+    lines.append(f"# TYPE {PREFIX}_cycle_duration_seconds histogram")
+    for entry, histogram in cycle_histograms:
+        _histogram(lines, f"{PREFIX}_cycle_duration_seconds", histogram, {"entry": entry})
+    lines.append(f"# HELP {PREFIX}_transaction_seconds Duration of the lock, send and receive phases of the transactions")
+    lines.append(f"# TYPE {PREFIX}_transaction_seconds histogram")
+    for labels, histogram in transaction_histograms:
+        _histogram(lines, f"{PREFIX}_transaction_seconds", histogram, labels)
+    return "\n".join(lines) + "\n"
+
+
+class HomeHeatControlMetricsView(HomeAssistantView):
+    """Metrics of all hubs, needs an authenticated request"""
+
+    url = METRICS_URL
+    name = "api:home_heat_control:metrics"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+
+    async def get(self, request: web.Request) -> web.Response:
+        hubs = {name: hub_data["hub"] for name, hub_data in self._hass.data.get(DOMAIN, {}).items()}
+        return web.Response(body=render_metrics(hubs).encode(), headers={"Content-Type": CONTENT_TYPE})
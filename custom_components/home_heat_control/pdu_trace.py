@@ -0,0 +1,202 @@
+"""Record the Modbus PDUs of a hub and replay them from a server.
+
+The recorder is passed as trace_pdu to the pymodbus client and appends
+every request and response to a trace file:
+
+    header  b"HHCTRACE" + version (uint16)
+    record  time since the first record in ns (uint64), flags (uint8, 1 = response),
+            unit id (uint8), function code (uint8), payload length (uint16), payload
+
+The replay server answers each request with the next response recorded
+for the same unit, function code and payload, after the recorded response
+time divided by --speed:
+
+    python -m custom_components.home_heat_control.pdu_trace replay trace.pdutrace --port 5020 --speed 10
+    python -m custom_components.home_heat_control.pdu_trace dump trace.pdutrace
+"""
+import argparse
+import asyncio
+import logging
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACE_MAGIC = b"HHCTRACE"
+TRACE_VERSION = 1
+TRACE_FILE_SUFFIX = ".pdutrace"
+FLAG_RESPONSE = 1
+
+_HEADER = struct.Struct("<8sH")
+_RECORD = struct.Struct("<QBBBH")
+_MBAP = struct.Struct(">HHHB")
+
+EXCEPTION_ILLEGAL_ADDRESS = 2
+
+
+class PduTraceRecorder:
+    """trace_pdu callback of a pymodbus client writing all PDUs to a trace file, the file is created with the first PDU"""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = 0
+        self._file = None
+        self._start = None
+        self._lock = threading.Lock()
+
+    def trace_pdu(self, sending, pdu):
+        payload = pdu.encode()
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.write(_RECORD.pack(
+                time.monotonic_ns() - self._start,
+                0 if sending else FLAG_RESPONSE,
+                pdu.dev_id & 0xFF,
+                pdu.function_code & 0xFF,
+                len(payload),
+            ))
+            self._file.write(payload)
+            self.records += 1
+        return pdu
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        #appends after a reconnect of the hub, the time base stays the same
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION))
+        if self._start is None:
+            self._start = time.monotonic_ns()
+        _LOGGER.info(f"Recording Modbus traffic to {self.path}")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                _LOGGER.info(f"Recorded {self.records} PDUs to {self.path}")
+
+
+def read_trace(path):
+    """Return the records of a trace file as (time ns, response, unit id, function code, payload)."""
+    records = []
+    with open(path, "rb") as trace_file:
+        data = trace_file.read()
+    magic, version = _HEADER.unpack_from(data)
+    if magic != TRACE_MAGIC or version != TRACE_VERSION:
+        raise ValueError(f"{path} is not a version {TRACE_VERSION} PDU trace")
+    offset = _HEADER.size
+    while offset + _RECORD.size <= len(data):
+        timestamp, flags, unit, function_code, length = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        records.append((timestamp, bool(flags & FLAG_RESPONSE), unit, function_code, data[offset:offset + length]))
+        offset += length
+    return records
+
+
+def pair_transactions(records):
+    """Map (unit id, function code, request payload) to a queue of (response time ns, response function code, response payload)."""
+    transactions = {}
+    request = None
+    for timestamp, response, unit, function_code, payload in records:
+        if not response:
+            request = (timestamp, unit, function_code, payload)
+            continue
+        if request is None or request[1] != unit or request[2] != function_code & 0x7F:
+            continue
+        transactions.setdefault(request[1:], deque()).append((timestamp - request[0], function_code, payload))
+        request = None
+    return transactions
+
+
+class ReplayServer:
+    """Modbus TCP server answering requests from the transactions of a trace"""
+
+    def __init__(self, transactions, speed=1.0, loop_trace=True):
+        self._transactions = transactions
+        self._speed = speed
+        self._loop_trace = loop_trace
+        self.served = 0
+        self.missed = 0
+
+    def _response(self, key):
+        queue = self._transactions.get(key)
+        if not queue:
+            return None
+        response = queue.popleft()
+        if self._loop_trace:
+            queue.append(response)
+        return response
+
+    async def async_handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(_MBAP.size)
+                transaction_id, protocol_id, length, unit = _MBAP.unpack(header)
+                pdu = await reader.readexactly(length - 1)
+                response = self._response((unit, pdu[0], pdu[1:]))
+                if response is None:
+                    self.missed += 1
+                    _LOGGER.warning(f"No recorded response for unit {unit} function {pdu[0]} request {pdu[1:].hex()}")
+                    function_code, payload = pdu[0] | 0x80, bytes([EXCEPTION_ILLEGAL_ADDRESS])
+                else:
+                    self.served += 1
+                    delay, function_code, payload = response
+                    await asyncio.sleep(delay / 1e9 / self._speed)
+                writer.write(_MBAP.pack(transaction_id, protocol_id, len(payload) + 2, unit) + bytes([function_code]) + payload)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def async_start_replay(path, host="127.0.0.1", port=5020, speed=1.0, loop_trace=True):
+    """Start a replay server for a trace file, returns (asyncio server, replay server)."""
+    transactions = pair_transactions(read_trace(path))
+    replay = ReplayServer(transactions, speed, loop_trace)
+    server = await asyncio.start_server(replay.async_handle, host, port)
+    _LOGGER.info(f"Replaying {sum(len(queue) for queue in transactions.values())} transactions of {path} on {host}:{port}")
+    return server, replay
+
+
+def _dump(path):
+    for timestamp, response, unit, function_code, payload in read_trace(path):
+        print(f"{timestamp / 1e6:12.3f} ms {'<' if response else '>'} unit {unit} fc {function_code:3d} {payload.hex()}")
+
+
+async def _async_replay(args):
+    server, _replay = await async_start_replay(args.trace, args.host, args.port, args.speed, not args.once)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    dump = commands.add_parser("dump", help="print the records of a trace")
+    dump.add_argument("trace")
+    replay = commands.add_parser("replay", help="serve the responses of a trace")
+    replay.add_argument("trace")
+    replay.add_argument("--host", default="127.0.0.1")
+    replay.add_argument("--port", type=int, default=5020)
+    replay.add_argument("--speed", type=float, default=1.0, help="divide the recorded response times by this factor")
+    replay.add_argument("--once", action="store_true", help="answer every recorded transaction only once")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "dump":
+        _dump(args.trace)
+        return
+    try:
+        asyncio.run(_async_replay(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Firmware dependent register map profiles.
+
+register_profiles.json lists one profile per application firmware range.
+The profile with the highest min_appl_sw_version not above the detected
+appl_sw_version is used, "base" if the version is unknown. A profile only
+lists the registers that differ from HHCSENSOR_TYPES:
+
+    "registers": {
+        "heatcircuit_1_status": {"address": 240},
+        "woodburner_stop_schueralarm": {"address": null},
+        "heatcircuit_1_return_setpoint": {"address": 48, "codec": "temperature", "name": "HK1 Rücklauf Soll", "unit": "°C"}
+    }
+
+Moved registers change "address" (and optionally "slave" or "codec"), an
+address of null removes the entity and unknown keys with a "name" are
+added as plain sensors. "templates" overrides base, stride or count of
+HHC_TEMPLATES, e.g. {"heatcircuit": {"base": 300, "count": 10}}, before the
+register overrides are applied. "dtc_status" gives the range of the DTC
+status words from the controller documentation, e.g. {"address": 5,
+"count": 8}, without it the active DTCs are not read. Compiled profiles
+are kept in memory, compiling takes a few ms.
+"""
+import hashlib
+import json
+import logging
+import os
+
+from .const import (
+    DEFAULT_MODBUS_ADDRESS,
+    DTC_STATUS_KEY,
+    get_register_codecs,
+    get_sensor_types,
+    template_layout,
+)
+from .homeheatcontrol import CODECS, plan_blocks
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILES_FILE = os.path.join(os.path.dirname(__file__), "register_profiles.json")
+BASE_PROFILE = "base"
+
+#profile id: compiled profile of this process
+_COMPILED_PROFILES = {}
+
+def parse_version(version):
+    """"1.2.3" to (1, 2, 3), None if it is not a version"""
+    try:
+        return tuple(int(part) for part in str(version).split("."))
+    except ValueError:
+        return None
+
+def load_profiles():
+    """Read the profile definitions, blocking."""
+    with open(PROFILES_FILE, encoding="utf-8") as profiles_file:
+        return json.load(profiles_file)["profiles"]
+
+def select_profile(profiles, appl_sw_version):
+    """Return the profile for a firmware version."""
+    version = parse_version(appl_sw_version) if appl_sw_version is not None else None
+    selected = next(profile for profile in profiles if profile["id"] == BASE_PROFILE)
+    if version is None:
+        return selected
+    for profile in profiles:
+        min_version = parse_version(profile["min_appl_sw_version"])
+        if min_version <= version and min_version > parse_version(selected["min_appl_sw_version"]):
+            selected = profile
+    return selected
+
+def compile_profile(profile):
+    """Apply a profile to HHCSENSOR_TYPES, returns the codec table and the full read plan."""
+    layout = template_layout(profile.get("templates"))
+    codecs = get_register_codecs(layout)
+    registers = {}
+    for sensor_info in get_sensor_types(layout):
+        key = sensor_info[2].key
+        registers[key] = [sensor_info[0], sensor_info[1], codecs.get(key)]
+
+    extra_sensors = {}
+    for key, override in profile.get("registers", {}).items():
+        if key not in registers:
+            if "name" not in override or override.get("address") is None:
+                _LOGGER.warning(f"Profile {profile['id']}: register {key} is unknown and has no name, ignored")
+                continue
+            extra_sensors[key] = {"name": override["name"], "unit": override.get("unit")}
+            registers[key] = [DEFAULT_MODBUS_ADDRESS, None, "uint16"]
+        if "codec" in override and override["codec"] not in CODECS:
+            _LOGGER.warning(f"Profile {profile['id']}: unknown codec {override['codec']} for {key}, ignored")
+            continue
+        registers[key] = [
+            override.get("slave", registers[key][0]),
+            override.get("address", registers[key][1]),
+            override.get("codec", registers[key][2]),
+        ]
+
+    addresses = {}
+    owners = {}
+    for key, (slave, address, codec) in registers.items():
+        if address is None or codec is None:
+            continue
+        #e.g. a template count overlapping the fixed registers
+        if (slave, address) in owners:
+            _LOGGER.warning(f"Profile {profile['id']}: {key} and {owners[(slave, address)]} are both mapped to register {address}")
+        owners[(slave, address)] = key
+        addresses.setdefault(slave, set()).update(range(address, address + CODECS[codec][0]))
+    dtc_status = profile.get(DTC_STATUS_KEY)
+    if dtc_status is not None:
+        dtc_status = [dtc_status.get("slave", DEFAULT_MODBUS_ADDRESS), dtc_status["address"], dtc_status["count"]]
+        addresses.setdefault(dtc_status[0], set()).update(range(dtc_status[1], dtc_status[1] + dtc_status[2]))
+    read_plan = [[slave, start, count] for slave in sorted(addresses) for start, count in plan_blocks(addresses[slave])]
+
+    return {
+        "id": profile["id"],
+        "layout": [list(template) for template in layout],
+        "registers": registers,
+        "extra_sensors": extra_sensors,
+        "dtc_status": dtc_status,
+        "read_plan": read_plan,
+    }
+
+async def async_get_register_profile(hass, appl_sw_version):
+    """Return the compiled profile for a firmware version, compiled once per process."""
+    profiles = await hass.async_add_executor_job(load_profiles)
+    profile = select_profile(profiles, appl_sw_version)
+    #register_profiles.json may change between reloads, the code not
+    source_hash = hashlib.sha1(json.dumps(profile, sort_keys=True).encode()).hexdigest()
+
+    compiled = _COMPILED_PROFILES.get(profile["id"])
+    if compiled is not None and compiled["source_hash"] == source_hash:
+        return compiled
+
+    _LOGGER.debug(f"Compiling register profile {profile['id']}")
+    compiled = await hass.async_add_executor_job(compile_profile, profile)
+    compiled["source_hash"] = source_hash
+    _COMPILED_PROFILES[profile["id"]] = compiled
+    return compiled
+
+def select_profile_id(appl_sw_version):
+    """Return the id of the profile for a firmware version, blocking."""
+    return select_profile(load_profiles(), appl_sw_version)["id"]
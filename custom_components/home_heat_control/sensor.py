@@ -1,21 +1,37 @@
 import logging
 from typing import Optional, Dict, Any
 from .const import (
-    HHCSENSOR_TYPES,
     DOMAIN,
     ATTR_MANUFACTURER,
 )
 from homeassistant.const import (
     CONF_NAME,
-    STATE_UNAVAILABLE
+    STATE_UNAVAILABLE,
+    EntityCategory,
+    UnitOfTime,
     )
 from homeassistant.components.sensor import (
     SensorEntity,
-    SensorEntityDescription
+    SensorEntityDescription,
+    SensorStateClass,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+#hub statistics: [description, factor to the unit of the sensor]
+DIAGNOSTIC_SENSOR_TYPES = [
+    [SensorEntityDescription(name="Zyklusdauer", key="cycle_duration", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=UnitOfTime.MILLISECONDS, icon="mdi:timer-sand"), 1000],
+    [SensorEntityDescription(name="Transaktionen pro Zyklus", key="cycle_transactions", state_class=SensorStateClass.MEASUREMENT, icon="mdi:swap-horizontal"), 1],
+    [SensorEntityDescription(name="Gelesene Register", key="cycle_registers", state_class=SensorStateClass.MEASUREMENT, icon="mdi:counter"), 1],
+    [SensorEntityDescription(name="Lock Wartezeit", key="cycle_lock_wait", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=UnitOfTime.MILLISECONDS, icon="mdi:lock-clock"), 1000],
+    [SensorEntityDescription(name="Fehlgeschlagene Blöcke", key="failed_blocks", state_class=SensorStateClass.TOTAL_INCREASING, icon="mdi:alert-circle-outline"), 1],
+    [SensorEntityDescription(name="Verbindungsaufbauten", key="reconnects", state_class=SensorStateClass.TOTAL_INCREASING, icon="mdi:lan-connect"), 1],
+    [SensorEntityDescription(name="Übersprungene Zyklen", key="skipped_cycles", state_class=SensorStateClass.TOTAL_INCREASING, icon="mdi:debug-step-over"), 1],
+    [SensorEntityDescription(name="Überlange Zyklen", key="overrun_cycles", state_class=SensorStateClass.TOTAL_INCREASING, icon="mdi:timer-alert-outline"), 1],
+    [SensorEntityDescription(name="Wartende Schreibvorgänge", key="write_queue", state_class=SensorStateClass.MEASUREMENT, icon="mdi:tray-full"), 1],
+    [SensorEntityDescription(name="Datenalter", key="data_age", state_class=SensorStateClass.MEASUREMENT, unit_of_measurement=UnitOfTime.SECONDS, icon="mdi:clock-outline"), 1],
+]
+
 
 async def async_setup_entry(hass, entry, async_add_entities):
     conf_name = entry.data[CONF_NAME]
@@ -28,19 +44,18 @@ async def async_setup_entry(hass, entry, async_add_entities):
     }
 
     entities = []
-    for sensor_info in HHCSENSOR_TYPES:
-        sensorType = str(type(sensor_info[2])).split(".")[-1].split("'")[0]
-        sensorTypeCompare = str(SensorEntityDescription).split(".")[-1].split("'")[0]
-        if (sensorType == sensorTypeCompare):
-            sensor = HHCSensor(
-                conf_name,
-                hub,
-                device_info,
-                sensor_info[0],     #slave ID
-                sensor_info[1],     #modbus address
-                sensor_info[2],     #sensor description
-            )
-            entities.append(sensor)
+    for entity_info in hub.get_platform_entities("sensor"):
+        sensor = HHCSensor(
+            conf_name,
+            hub,
+            device_info,
+            entity_info.slave,
+            entity_info.address,
+            entity_info.description,
+        )
+        entities.append(sensor)
+    for description, factor in DIAGNOSTIC_SENSOR_TYPES:
+        entities.append(HHCDiagnosticSensor(conf_name, hub, device_info, description, factor))
 
     async_add_entities(entities)
     return True
@@ -68,6 +83,10 @@ class HHCSensor(SensorEntity):
     def _modbus_data_updated(self):
         self.async_write_ha_state()
 
+    async def async_update(self) -> None:
+        """Read the registers of this entity right away, used by homeassistant.update_entity."""
+        await self._hub.async_request_refresh([self])
+
     @property
     def icon(self):
         """Return the sensor icon."""
@@ -100,4 +119,54 @@ class HHCSensor(SensorEntity):
             return self._data
         else:
             return STATE_UNAVAILABLE
-        
\ No newline at end of file
+        
+
+
+class HHCDiagnosticSensor(SensorEntity):
+    """Statistics of the hub, updated after every cycle."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, platform_name, hub, device_info, description: SensorEntityDescription, factor):
+        self.entity_description = description
+        self._platform_name = platform_name
+        self._hub = hub
+        self._device_info = device_info
+        self._factor = factor
+        self._data = None
+
+    async def async_added_to_hass(self):
+        self._hub.async_add_diagnostic_sensor(self)
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._hub.async_remove_diagnostic_sensor(self)
+
+    def _modbus_data_updated(self):
+        value = self._hub.diagnostics[self.entity_description.key]
+        self._data = round(value * self._factor, 1) if value is not None else None
+        self.async_write_ha_state()
+
+    @property
+    def icon(self):
+        return self.entity_description.icon
+
+    @property
+    def should_poll(self) -> bool:
+        """Data is delivered by the hub"""
+        return False
+
+    @property
+    def device_info(self) -> Optional[Dict[str, Any]]:
+        return self._device_info
+
+    @property
+    def unique_id(self) -> Optional[str]:
+        return f"{self._platform_name}_diagnostic_{self.entity_description.key}"
+
+    @property
+    def unit_of_measurement(self):
+        return self.entity_description.unit_of_measurement
+
+    @property
+    def state(self):
+        return self._data
@@ -0,0 +1,264 @@
+"""Services writing, saving and restoring the controller parameters, reading entities on demand, dumping the transaction latencies and profiling the hub."""
+import asyncio
+import logging
+from datetime import datetime
+
+import voluptuous as vol
+
+import homeassistant.helpers.config_validation as cv
+from homeassistant.const import ATTR_ENTITY_ID, CONF_NAME
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, STORAGE_VERSION, PROFILE_DIRECTORY
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_SET_SCHEDULE = "set_schedule"
+SERVICE_SET_HEATING_CURVE = "set_heating_curve"
+SERVICE_BACKUP_PARAMETERS = "backup_parameters"
+SERVICE_RESTORE_PARAMETERS = "restore_parameters"
+SERVICE_REFRESH = "refresh"
+SERVICE_DUMP_LATENCY = "dump_latency"
+SERVICE_PROFILE = "profile"
+
+ATTR_HEATCIRCUITS = "heatcircuits"
+ATTR_BACKUP = "backup"
+ATTR_CYCLES = "cycles"
+
+#platforms of the controller parameters saved by backup_parameters
+PARAMETER_PLATFORMS = ["number", "select", "time", "switch"]
+
+#service field: key suffix of the heat circuit register
+SCHEDULE_FIELDS = [
+    "timer_1_mode",
+    "timer_1_start",
+    "timer_1_stop",
+    "timer_2_mode",
+    "timer_2_start",
+    "timer_2_stop",
+]
+HEATING_CURVE_FIELDS = [
+    "curve_inclination",
+    "curve_niveau",
+    "curve_targettemperature_day",
+    "curve_targettemperature_night",
+]
+
+_BASE_SCHEMA = {
+    vol.Optional(CONF_NAME): cv.string,
+    vol.Required(ATTR_HEATCIRCUITS): vol.All(cv.ensure_list, [vol.All(vol.Coerce(int), vol.Range(min=1))]),
+}
+
+SET_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        **_BASE_SCHEMA,
+        vol.Optional("timer_1_mode"): cv.string,
+        vol.Optional("timer_1_start"): cv.time,
+        vol.Optional("timer_1_stop"): cv.time,
+        vol.Optional("timer_2_mode"): cv.string,
+        vol.Optional("timer_2_start"): cv.time,
+        vol.Optional("timer_2_stop"): cv.time,
+    }
+)
+
+SET_HEATING_CURVE_SCHEMA = vol.Schema(
+    {
+        **_BASE_SCHEMA,
+        vol.Optional("curve_inclination"): vol.Coerce(float),
+        vol.Optional("curve_niveau"): vol.Coerce(float),
+        vol.Optional("curve_targettemperature_day"): vol.Coerce(float),
+        vol.Optional("curve_targettemperature_night"): vol.Coerce(float),
+    }
+)
+
+BACKUP_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Required(ATTR_BACKUP): cv.string,
+    }
+)
+
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+    }
+)
+
+DUMP_LATENCY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NAME): cv.string,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NAME): cv.string,
+        vol.Optional(ATTR_CYCLES, default=10): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+    }
+)
+
+
+def get_hub(hass: HomeAssistant, name):
+    """Return the hub of a config entry name, the name may be left out if there is only one."""
+    hubs = hass.data.get(DOMAIN, {})
+    if name is None:
+        if len(hubs) != 1:
+            raise ServiceValidationError(f"{len(hubs)} controllers are set up, select one with '{CONF_NAME}'")
+        return next(iter(hubs.values()))["hub"]
+    if name not in hubs:
+        raise ServiceValidationError(f"No controller named {name}")
+    return hubs[name]["hub"]
+
+
+def encode_value(entity_info, value):
+    """Raw register value of a select option, time or number in the units of its entity."""
+    description = entity_info.description
+    options = getattr(description, "options", None)
+    if options is not None:
+        if value not in options:
+            raise ServiceValidationError(f"{description.key}: '{value}' is not one of {options}")
+        return options.index(value)
+    if hasattr(value, "hour"):
+        return (value.hour << 8) + value.minute
+    native_min_value = getattr(description, "native_min_value", None)
+    native_max_value = getattr(description, "native_max_value", None)
+    if native_min_value is not None and not native_min_value <= value <= native_max_value:
+        raise ServiceValidationError(f"{description.key}: {value} is outside {native_min_value}..{native_max_value}")
+    return round(value / entity_info.parameter) & 0xFFFF   #signed 16 bit
+
+
+async def _async_write_heatcircuit_fields(hass: HomeAssistant, call: ServiceCall, fields):
+    hub = get_hub(hass, call.data.get(CONF_NAME))
+    values = {}
+    for heatcircuit in call.data[ATTR_HEATCIRCUITS]:
+        for field in fields:
+            if field not in call.data:
+                continue
+            key = f"heatcircuit_{heatcircuit}_{field}"
+            entity_info = hub.get_entity_info(key)
+            if entity_info is None:
+                raise ServiceValidationError(f"Heat circuit {heatcircuit} is not installed")
+            values[(entity_info.slave, entity_info.address)] = encode_value(entity_info, call.data[field])
+    if not values:
+        raise ServiceValidationError("Nothing to write")
+
+    failed = await hub.async_write_register_values(values)
+    if failed:
+        raise HomeAssistantError(f"Could not write registers {failed}")
+
+
+def _backup_store(hass: HomeAssistant, hub):
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{slugify(hub.name)}_parameter_backups")
+
+
+async def _async_backup_parameters(hass: HomeAssistant, call: ServiceCall):
+    """Save the raw values of all parameter entities under a backup name, keyed by entity key so they survive address changes."""
+    hub = get_hub(hass, call.data.get(CONF_NAME))
+    keys = [entity_info.description.key for platform in PARAMETER_PLATFORMS for entity_info in hub.get_platform_entities(platform)]
+    values = await hub.async_read_entity_registers(keys)
+    if not values:
+        raise HomeAssistantError("Could not read the controller parameters")
+
+    store = _backup_store(hass, hub)
+    backups = await store.async_load() or {}
+    backups[call.data[ATTR_BACKUP]] = {
+        "created": dt_util.utcnow().isoformat(),
+        "profile": hub.profile["id"],
+        "registers": values,
+    }
+    await store.async_save(backups)
+    _LOGGER.info(f"Saved {len(values)} of {len(keys)} parameters as backup {call.data[ATTR_BACKUP]}")
+
+
+async def _async_restore_parameters(hass: HomeAssistant, call: ServiceCall):
+    """Write the parameters of a backup that differ from the controller."""
+    hub = get_hub(hass, call.data.get(CONF_NAME))
+    backups = await _backup_store(hass, hub).async_load() or {}
+    if call.data[ATTR_BACKUP] not in backups:
+        raise ServiceValidationError(f"No backup named {call.data[ATTR_BACKUP]}")
+    backup = backups[call.data[ATTR_BACKUP]]["registers"]
+
+    live = await hub.async_read_entity_registers(list(backup))
+    values = {}
+    for key, value in backup.items():
+        entity_info = hub.get_entity_info(key)
+        if entity_info is None:
+            _LOGGER.warning(f"Backup {call.data[ATTR_BACKUP]}: {key} is not installed, skipped")
+            continue
+        if live.get(key) != value:
+            values[(entity_info.slave, entity_info.address)] = value
+    if not values:
+        _LOGGER.info(f"Backup {call.data[ATTR_BACKUP]}: controller is up to date")
+        return
+
+    failed = await hub.async_write_register_values(values)
+    if failed:
+        raise HomeAssistantError(f"Could not write registers {failed}")
+    _LOGGER.info(f"Backup {call.data[ATTR_BACKUP]}: restored {len(values)} parameters")
+
+
+async def _async_refresh(hass: HomeAssistant, call: ServiceCall):
+    """Read the requested entities, all entities of a controller without entity_id."""
+    if ATTR_ENTITY_ID not in call.data:
+        hub = get_hub(hass, call.data.get(CONF_NAME))
+        await hub.async_request_refresh(list(hub.sensors))
+        return
+
+    entity_ids = set(call.data[ATTR_ENTITY_ID])
+    requests = []
+    for hub_data in hass.data.get(DOMAIN, {}).values():
+        sensors = [sensor for sensor in hub_data["hub"].sensors if getattr(sensor, "entity_id", None) in entity_ids]
+        if sensors:
+            requests.append(hub_data["hub"].async_request_refresh(sensors))
+    await asyncio.gather(*requests)
+
+
+async def _async_profile(hass: HomeAssistant, call: ServiceCall):
+    """Profile the next cycles of a hub, the hub logs the top functions and saves the stats under the config dir."""
+    hub = get_hub(hass, call.data.get(CONF_NAME))
+    path = hass.config.path(PROFILE_DIRECTORY, f"{slugify(hub.name)}_{datetime.now():%Y%m%d-%H%M%S}.pstats")
+    if not hub.async_start_profile(call.data[ATTR_CYCLES], path):
+        raise ServiceValidationError(f"{hub.name} is already being profiled")
+
+
+async def async_setup_services(hass: HomeAssistant):
+    """Register the services of the integration."""
+
+    async def async_set_schedule(call: ServiceCall):
+        await _async_write_heatcircuit_fields(hass, call, SCHEDULE_FIELDS)
+
+    async def async_set_heating_curve(call: ServiceCall):
+        await _async_write_heatcircuit_fields(hass, call, HEATING_CURVE_FIELDS)
+
+    hass.services.async_register(DOMAIN, SERVICE_SET_SCHEDULE, async_set_schedule, schema=SET_SCHEDULE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_SET_HEATING_CURVE, async_set_heating_curve, schema=SET_HEATING_CURVE_SCHEMA)
+
+    async def async_backup_parameters(call: ServiceCall):
+        await _async_backup_parameters(hass, call)
+
+    async def async_restore_parameters(call: ServiceCall):
+        await _async_restore_parameters(hass, call)
+
+    hass.services.async_register(DOMAIN, SERVICE_BACKUP_PARAMETERS, async_backup_parameters, schema=BACKUP_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_RESTORE_PARAMETERS, async_restore_parameters, schema=BACKUP_SCHEMA)
+
+    async def async_refresh(call: ServiceCall):
+        await _async_refresh(hass, call)
+
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, async_refresh, schema=REFRESH_SCHEMA)
+
+    async def async_dump_latency(call: ServiceCall) -> ServiceResponse:
+        return get_hub(hass, call.data.get(CONF_NAME)).latency
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_DUMP_LATENCY, async_dump_latency, schema=DUMP_LATENCY_SCHEMA, supports_response=SupportsResponse.ONLY
+    )
+
+    async def async_profile(call: ServiceCall):
+        await _async_profile(hass, call)
+
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA)
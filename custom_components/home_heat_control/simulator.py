@@ -0,0 +1,413 @@
+"""Modbus TCP stand-in of the heating controller.
+
+Serves the register map of a register profile (HHCSENSOR_TYPES for the
+base profile) from pymodbus' server, so the hub can be exercised without
+the physical controller:
+
+    python -m custom_components.home_heat_control.simulator --port 5020 \
+        --not-installed woodburner gasburner --latency 20 --jitter 10
+
+Temperatures drift, statuses change every now and then and subsystems
+passed with --not-installed report the "not installed" status and sentinel
+values. Writes to the registers of switches, numbers, times, selects and
+buttons are accepted, the status registers the controller changes after a
+write (HHC_WRITE_DEPENDENCIES) change on the next tick. Latency, jitter,
+dropped connections, busy responses, strict addressing (ILLEGAL_ADDRESS on
+unmapped registers) and a controller without FC23 can be configured.
+"""
+import argparse
+import asyncio
+import logging
+import random
+
+from pymodbus.datastore import ModbusServerContext
+from pymodbus.datastore.context import ModbusBaseSlaveContext
+from pymodbus.pdu import ExceptionResponse
+from pymodbus.pdu.register_message import (
+    ReadHoldingRegistersRequest,
+    ReadWriteMultipleRegistersRequest,
+    WriteMultipleRegistersRequest,
+    WriteSingleRegisterRequest,
+)
+from pymodbus.server import ModbusTcpServer
+
+from .const import (
+    CONF_APPL_SW_VERSION,
+    DTC_STATUS_KEY,
+    SENTINEL_VALUES,
+    get_platform_entities,
+    get_subsystems,
+    get_write_dependencies,
+)
+from .homeheatcontrol import (
+    CODECS,
+    PUMP_STATES,
+    MIXER_STATES,
+    VALVE_STATES,
+    HC_STATES,
+    BUFFERSTORAGE_STATES,
+    BUFFERSTORAGE_ACTIVE_STATES,
+    BUFFERSTORAGE_CHARGE_STATES,
+    WARMWATER_BOILER_STATES,
+    CIRCULATION_CIRCUIT_STATES,
+    BURNER_STATES,
+)
+from .profiles import compile_profile, load_profiles, parse_version, select_profile
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SIMULATOR_PORT = 5020
+DEFAULT_TICK_INTERVAL = 1
+DEFAULT_APPL_SW_VERSION = "1.0.0"
+FBL_SW_VERSION = (1, 0, 0)
+
+WRITABLE_PLATFORMS = ["switch", "number", "time", "select", "button"]
+
+#codec name: states of the status register, state 0 is "not installed"
+STATUS_STATES = {
+    "pump_status": PUMP_STATES,
+    "mixer_status": MIXER_STATES,
+    "valve_status": VALVE_STATES,
+    "hc_status": HC_STATES,
+    "bufferstorage_status": BUFFERSTORAGE_STATES,
+    "bufferstorage_active_status": BUFFERSTORAGE_ACTIVE_STATES,
+    "bufferstorage_charge_status": BUFFERSTORAGE_CHARGE_STATES,
+    "warmwater_boiler_status": WARMWATER_BOILER_STATES,
+    "circulation_circuit_status": CIRCULATION_CIRCUIT_STATES,
+    "burner_status": BURNER_STATES,
+}
+
+#key fragment: starting temperature in °C, the first match wins
+TEMPERATURE_DEFAULTS = [
+    ("outside", 8.0),
+    ("room", 21.0),
+    ("exhaust", 140.0),
+    ("returnflow", 35.0),
+    ("forerun", 45.0),
+    ("bufferstorage", 60.0),
+    ("boiler", 52.0),
+    ("circulation", 45.0),
+]
+
+#key suffix: starting raw value of the parameters
+PARAMETER_DEFAULTS = {
+    "heatcontrolmanagement_enabled": 1,
+    "_timer_1_start": 6 << 8,
+    "_timer_1_stop": 22 << 8,
+    "_timer_2_start": 12 << 8,
+    "_timer_2_stop": 13 << 8,
+    "_curve_inclination": 12,
+    "_curve_targettemperature_day": 21,
+    "_curve_targettemperature_night": 17,
+    "_targetForerunTemperature": 45,
+    "_mixerposition": 50,
+    "_filllevel": 650,
+}
+
+TEMPERATURE_DRIFT = 0.2
+TEMPERATURE_SPAN = 5.0
+STATUS_CHANGE_RATE = 0.02
+DTC_RATE = 0.001
+
+
+class SimulatedController(ModbusBaseSlaveContext):
+    """Register image of one controller, used as the datastore of all unit ids."""
+
+    def __init__(
+        self,
+        profile=None,
+        appl_sw_version=DEFAULT_APPL_SW_VERSION,
+        not_installed=(),
+        latency=0,
+        jitter=0,
+        drop_rate=0,
+        exception_rate=0,
+        strict=False,
+        readwrite=True,
+        seed=None,
+    ):
+        if profile is None:
+            profile = compile_profile(select_profile(load_profiles(), appl_sw_version))
+        self.profile = profile
+        self.appl_sw_version = appl_sw_version
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.drop_rate = drop_rate
+        self.exception_rate = exception_rate
+        self.strict = strict
+        self.readwrite = readwrite
+        self.server = None
+        self.requests = 0
+        self.writes = 0
+        self._random = random.Random(seed)
+        self.registers = [0] * 0x10000
+
+        layout = tuple(tuple(template) for template in profile["layout"])
+        self._codecs = {}
+        self._temperatures = {}
+        self._mapped = set()
+        self._writable = {}
+        self._pending = set()
+        self._buttons = set()
+        self._not_installed = set()
+
+        for key, (slave, address, codec) in profile["registers"].items():
+            if address is None:
+                continue
+            if codec is not None:
+                self._codecs[key] = (address, codec)
+                self._mapped.update(range(address, address + CODECS[codec][0]))
+        #the DTC status words only exist in profiles documenting their range
+        self._dtc_status = profile.get(DTC_STATUS_KEY)
+        if self._dtc_status is not None:
+            self._mapped.update(range(self._dtc_status[1], self._dtc_status[1] + self._dtc_status[2]))
+
+        dependencies = get_write_dependencies(layout)
+        for platform in WRITABLE_PLATFORMS:
+            for entity_info in get_platform_entities(platform, layout):
+                key = entity_info.description.key
+                address = profile["registers"].get(key, [None, None])[1]
+                if address is None:
+                    continue
+                self._writable.setdefault(address, set()).update(dependencies.get(key, []))
+                self._mapped.add(address)
+                if platform == "button":
+                    self._buttons.add(address)
+
+        for key, (address, codec) in self._codecs.items():
+            self.registers[address] = self._initial_value(key, codec)
+        self._set_versions()
+
+        subsystems = get_subsystems(layout)
+        for subsystem in not_installed:
+            if subsystem not in subsystems:
+                raise ValueError(f"Unknown subsystem {subsystem}, one of {sorted(subsystems)}")
+            status_key, not_installed_value = subsystems[subsystem]
+            for key, (address, codec) in self._codecs.items():
+                if key.startswith(f"{subsystem}_"):
+                    self.registers[address] = self._sentinel(codec)
+                    self._not_installed.add(key)
+            if status_key in self._codecs:
+                self.registers[self._codecs[status_key][0]] = not_installed_value
+
+    def _initial_value(self, key, codec):
+        if codec == "temperature":
+            temperature = next((value for fragment, value in TEMPERATURE_DEFAULTS if fragment in key), 40.0)
+            self._temperatures[key] = temperature
+            return round(temperature * 10) & 0xFFFF
+        if codec in STATUS_STATES:
+            return 1
+        for suffix, value in PARAMETER_DEFAULTS.items():
+            if key.endswith(suffix):
+                return value
+        return 0
+
+    def _sentinel(self, codec):
+        if codec in SENTINEL_VALUES:
+            return SENTINEL_VALUES[codec]
+        if codec == "mixerposition":
+            #decoded as None, not pruned
+            return 0xFFFE
+        return 0
+
+    def _set_versions(self):
+        """fbl and appl version share register 1, see decode_fbl_sw_version and decode_appl_sw_version"""
+        fbl_address = self._codecs.get("fbl_sw_version", (None,))[0]
+        appl_address = self._codecs.get(CONF_APPL_SW_VERSION, (None,))[0]
+        major, minor, patch = (parse_version(self.appl_sw_version) + (0, 0, 0))[:3]
+        if appl_address is not None:
+            self.registers[appl_address] = major & 0xFF
+            self.registers[appl_address + 1] = (minor << 8) | patch
+        if fbl_address is not None:
+            self.registers[fbl_address] = (FBL_SW_VERSION[0] << 8) | FBL_SW_VERSION[1]
+            self.registers[fbl_address + 1] |= FBL_SW_VERSION[2] << 8
+
+    def tick(self):
+        """advance the simulated plant by one step"""
+        for address in self._buttons:
+            self.registers[address] = 0
+        for key, (address, codec) in self._codecs.items():
+            if key in self._not_installed:
+                continue
+            if codec == "temperature":
+                start = self._temperatures[key]
+                current = self.registers[address] - 0x10000 if self.registers[address] & 0x8000 else self.registers[address]
+                current = current / 10 + self._random.uniform(-TEMPERATURE_DRIFT, TEMPERATURE_DRIFT)
+                current = min(max(current, start - TEMPERATURE_SPAN), start + TEMPERATURE_SPAN)
+                self.registers[address] = round(current * 10) & 0xFFFF
+            elif codec in STATUS_STATES:
+                if key in self._pending or self._random.random() < STATUS_CHANGE_RATE:
+                    self.registers[address] = self._random.randrange(1, len(STATUS_STATES[codec]))
+            elif codec == "mixerposition" and key.endswith("_mixerposition"):
+                self.registers[address] = min(max(self.registers[address] + self._random.randint(-2, 2), 0), 100)
+        self._pending.clear()
+
+        dtcactive = self._codecs.get("dtcactive")
+        if dtcactive is not None and self._random.random() < DTC_RATE:
+            if self._dtc_status is not None:
+                _slave, address, count = self._dtc_status
+                dtc = self._random.randrange(16 * count)
+                self.registers[address + dtc // 16] |= 1 << (dtc % 16)
+            self.registers[dtcactive[0]] = 1
+
+    async def async_run(self, interval=DEFAULT_TICK_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            self.tick()
+
+    async def async_check(self, function_code, address, count, write=False):
+        """Delay a request and return the exception code it fails with, None if it is served."""
+        self.requests += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(max(self.latency + self._random.uniform(-self.jitter, self.jitter), 0))
+        if self.drop_rate and self._random.random() < self.drop_rate:
+            self.drop_connections()
+            return ExceptionResponse.SLAVE_FAILURE
+        if self.exception_rate and self._random.random() < self.exception_rate:
+            return ExceptionResponse.SLAVE_BUSY
+        if function_code == ReadWriteMultipleRegistersRequest.function_code and not self.readwrite:
+            return ExceptionResponse.ILLEGAL_FUNCTION
+        addresses = range(address, address + count)
+        if write and any(register not in self._writable for register in addresses):
+            return ExceptionResponse.ILLEGAL_ADDRESS
+        if self.strict and not write and any(register not in self._mapped for register in addresses):
+            return ExceptionResponse.ILLEGAL_ADDRESS
+        return None
+
+    def drop_connections(self):
+        """close all client connections, the response of the current request is lost"""
+        if self.server is None:
+            return
+        for connection in list(self.server.active_connections.values()):
+            connection.close()
+
+    def getValues(self, fc_as_hex, address, count=1):
+        return self.registers[address:address + count]
+
+    def setValues(self, fc_as_hex, address, values):
+        self.writes += 1
+        for offset, value in enumerate(values):
+            register = address + offset
+            self.registers[register] = value
+            self._pending.update(self._writable.get(register, ()))
+        self._clear_dtcs(address, values)
+
+    def _clear_dtcs(self, address, values):
+        """writing the dtcclear button clears all DTCs"""
+        dtcclear = self.profile["registers"].get("dtcclear", [None, None])[1]
+        dtcactive = self._codecs.get("dtcactive")
+        if dtcclear is None or dtcactive is None or not address <= dtcclear < address + len(values):
+            return
+        if values[dtcclear - address]:
+            if self._dtc_status is not None:
+                _slave, address, count = self._dtc_status
+                self.registers[address:address + count] = [0] * count
+            self.registers[dtcactive[0]] = 0
+
+    def reset(self):
+        pass
+
+
+class _SimulatedRead(ReadHoldingRegistersRequest):
+    async def update_datastore(self, context):
+        error = await context.async_check(self.function_code, self.address, self.count)
+        if error is not None:
+            return ExceptionResponse(self.function_code, error)
+        return await super().update_datastore(context)
+
+
+class _SimulatedWrite(WriteMultipleRegistersRequest):
+    async def update_datastore(self, context):
+        error = await context.async_check(self.function_code, self.address, self.count, write=True)
+        if error is not None:
+            return ExceptionResponse(self.function_code, error)
+        return await super().update_datastore(context)
+
+
+class _SimulatedWriteSingle(WriteSingleRegisterRequest):
+    async def update_datastore(self, context):
+        error = await context.async_check(self.function_code, self.address, 1, write=True)
+        if error is not None:
+            return ExceptionResponse(self.function_code, error)
+        return await super().update_datastore(context)
+
+
+class _SimulatedReadWrite(ReadWriteMultipleRegistersRequest):
+    async def update_datastore(self, context):
+        error = await context.async_check(self.function_code, self.write_address, self.write_count, write=True)
+        if error is None and context.strict:
+            error = await context.async_check(self.function_code, self.read_address, self.read_count)
+        if error is not None:
+            return ExceptionResponse(self.function_code, error)
+        return await super().update_datastore(context)
+
+
+SIMULATED_PDUS = [_SimulatedRead, _SimulatedWrite, _SimulatedWriteSingle, _SimulatedReadWrite]
+
+
+async def async_start_simulator(host="127.0.0.1", port=DEFAULT_SIMULATOR_PORT, tick_interval=DEFAULT_TICK_INTERVAL, **options):
+    """Start a simulated controller in the running loop, returns (server, controller, tick task)."""
+    controller = SimulatedController(**options)
+    server = ModbusTcpServer(
+        ModbusServerContext(slaves=controller, single=True),
+        address=(host, port),
+        custom_pdu=SIMULATED_PDUS,
+    )
+    controller.server = server
+    await server.serve_forever(background=True)
+    task = asyncio.create_task(controller.async_run(tick_interval))
+    _LOGGER.info(f"Simulated controller {controller.profile['id']} listening on {host}:{port}")
+    return server, controller, task
+
+
+async def async_stop_simulator(server, task):
+    task.cancel()
+    await server.shutdown()
+
+
+async def _async_main(args):
+    server, _controller, task = await async_start_simulator(
+        host=args.host,
+        port=args.port,
+        tick_interval=args.tick,
+        appl_sw_version=args.appl_sw_version,
+        not_installed=args.not_installed,
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        exception_rate=args.exception_rate,
+        strict=args.strict,
+        readwrite=not args.no_fc23,
+        seed=args.seed,
+    )
+    try:
+        await server.serving
+    finally:
+        await async_stop_simulator(server, task)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_SIMULATOR_PORT)
+    parser.add_argument("--appl-sw-version", default=DEFAULT_APPL_SW_VERSION, help="firmware version, selects the register profile")
+    parser.add_argument("--not-installed", nargs="*", default=[], metavar="SUBSYSTEM", help="subsystems reporting sentinel values")
+    parser.add_argument("--tick", type=float, default=DEFAULT_TICK_INTERVAL, help="seconds between two simulation steps")
+    parser.add_argument("--latency", type=float, default=0, help="response delay in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="random +- response delay in ms")
+    parser.add_argument("--drop-rate", type=float, default=0, help="share of requests closing the connection")
+    parser.add_argument("--exception-rate", type=float, default=0, help="share of requests answered with SLAVE_BUSY")
+    parser.add_argument("--strict", action="store_true", help="ILLEGAL_ADDRESS for reads of unmapped registers")
+    parser.add_argument("--no-fc23", action="store_true", help="ILLEGAL_FUNCTION for read/write multiple registers")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        asyncio.run(_async_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
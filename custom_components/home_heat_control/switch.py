@@ -1,7 +1,6 @@
 import logging
 from typing import Optional, Dict, Any
 from .const import (
-    HHCSENSOR_TYPES,
     DOMAIN,
     ATTR_MANUFACTURER,
 )
@@ -12,9 +11,6 @@ from homeassistant.const import (
     STATE_UNAVAILABLE
 )
 
-from pymodbus.constants import Endian
-from pymodbus.payload import BinaryPayloadBuilder
-
 from homeassistant.components.switch import (
     SwitchEntity,
     SwitchEntityDescription
@@ -34,19 +30,16 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
     }
 
     entities = []
-    for sensor_info in HHCSENSOR_TYPES:
-        sensorType = str(type(sensor_info[2])).split(".")[-1].split("'")[0]
-        sensorTypeCompare = str(SwitchEntityDescription).split(".")[-1].split("'")[0]
-        if (sensorType == sensorTypeCompare):
-            sensor = HHCSwitch(
-                conf_name,
-                hub,
-                device_info,
-                sensor_info[0],     #slave ID
-                sensor_info[1],     #modbus address
-                sensor_info[2],     #sensor description
-            )
-            entities.append(sensor)
+    for entity_info in hub.get_platform_entities("switch"):
+        sensor = HHCSwitch(
+            conf_name,
+            hub,
+            device_info,
+            entity_info.slave,
+            entity_info.address,
+            entity_info.description,
+        )
+        entities.append(sensor)
 
     async_add_entities(entities)
     return True
@@ -75,6 +68,10 @@ class HHCSwitch(SwitchEntity):
     def _modbus_data_updated(self) -> None:
         self.async_write_ha_state()
 
+    async def async_update(self) -> None:
+        """Read the registers of this entity right away, used by homeassistant.update_entity."""
+        await self._hub.async_request_refresh([self])
+
     @property
     def should_poll(self) -> bool:
         """Data is delivered by the hub"""
@@ -104,32 +101,26 @@ class HHCSwitch(SwitchEntity):
         """Turn the entity on."""
         """Change the selected value."""
         value = 1
-        builder = BinaryPayloadBuilder(byteorder=Endian.BIG, wordorder=Endian.LITTLE)
-        builder.add_16bit_uint(int(value))
+        payload = [int(value)]
         
-        _LOGGER.debug(f"try to write: Value:{builder.to_registers()}, Name:{self.entity_description.key}, Address:{self._address}")
+        _LOGGER.debug(f"try to write: Value:{payload}, Name:{self.entity_description.key}, Address:{self._address}")
           
-        response = self._hub.write_registers(unit=self._slaveId, address=self._address, payload=builder.to_registers())
-        if response.isError():
-            _LOGGER.error(f"Could not write: Value:{builder.to_registers()}, Name:{self.entity_description.key}, Address:{self._address}")
+        #the hub decodes the confirmed value into _data and updates the state
+        registers = await self._hub.async_write_registers(self._slaveId, self._address, payload)
+        if registers is None:
+            _LOGGER.error(f"Could not write: Value:{payload}, Name:{self.entity_description.key}, Address:{self._address}")
             return
-        
-        self._data = True
-        self.async_write_ha_state()
 
     async def async_turn_off(self) -> None:
         """Turn the entity off."""
         """Change the selected value."""
         value = 0
-        builder = BinaryPayloadBuilder(byteorder=Endian.BIG, wordorder=Endian.LITTLE)
-        builder.add_16bit_uint(int(value))
+        payload = [int(value)]
         
-        _LOGGER.debug(f"try to write: Value:{builder.to_registers()}, Name:{self.entity_description.key}, Address:{self._address}")
+        _LOGGER.debug(f"try to write: Value:{payload}, Name:{self.entity_description.key}, Address:{self._address}")
             
-        response = self._hub.write_registers(unit=self._slaveId, address=self._address, payload=builder.to_registers())
-        if response.isError():
-            _LOGGER.error(f"Could not write: Value:{builder.to_registers()}, Name:{self.entity_description.key}, Address:{self._address}")
+        #the hub decodes the confirmed value into _data and updates the state
+        registers = await self._hub.async_write_registers(self._slaveId, self._address, payload)
+        if registers is None:
+            _LOGGER.error(f"Could not write: Value:{payload}, Name:{self.entity_description.key}, Address:{self._address}")
             return
-        
-        self._data = False
-        self.async_write_ha_state()
@@ -3,14 +3,10 @@ from typing import Optional, Dict, Any
 from datetime import time
 
 from .const import (
-    HHCSENSOR_TYPES,
     DOMAIN,
     ATTR_MANUFACTURER,
 )
 
-from pymodbus.constants import Endian
-from pymodbus.payload import BinaryPayloadBuilder
-
 from homeassistant.const import (
     CONF_NAME,
     STATE_UNAVAILABLE
@@ -34,19 +30,16 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
     }
 
     entities = []
-    for sensor_info in HHCSENSOR_TYPES:
-        sensorType = str(type(sensor_info[2])).split(".")[-1].split("'")[0]
-        sensorTypeCompare = str(TimeEntityDescription).split(".")[-1].split("'")[0]
-        if (sensorType == sensorTypeCompare):
-            sensor = HHC_Time(
-                conf_name,
-                hub,
-                device_info,
-                sensor_info[0],     #slave ID
-                sensor_info[1],     #modbus address
-                sensor_info[2],     #sensor description
-            )
-            entities.append(sensor)
+    for entity_info in hub.get_platform_entities("time"):
+        sensor = HHC_Time(
+            conf_name,
+            hub,
+            device_info,
+            entity_info.slave,
+            entity_info.address,
+            entity_info.description,
+        )
+        entities.append(sensor)
 
     async_add_entities(entities)
     return True
@@ -74,6 +67,10 @@ class HHC_Time(TimeEntity):
     def _modbus_data_updated(self):
         self.async_write_ha_state()
 
+    async def async_update(self) -> None:
+        """Read the registers of this entity right away, used by homeassistant.update_entity."""
+        await self._hub.async_request_refresh([self])
+
     @property
     def icon(self):
         """Return the sensor icon."""
@@ -122,15 +119,12 @@ class HHC_Time(TimeEntity):
         """Change the selected value."""
         temp = value.hour << 8
         temp = temp + value.minute
-        builder = BinaryPayloadBuilder(byteorder=Endian.BIG, wordorder=Endian.LITTLE)
-        builder.add_16bit_uint(int(temp))
+        payload = [int(temp)]
 
-        _LOGGER.debug(f"try to write: Value:{value}/{builder.to_registers()}, Name:{self.entity_description.key}, Address:{self._address}")
+        _LOGGER.debug(f"try to write: Value:{value}/{payload}, Name:{self.entity_description.key}, Address:{self._address}")
 
-        response = self._hub.write_registers(unit=self._slaveId, address=self._address, payload=builder.to_registers())
-        if response.isError():
-            _LOGGER.error(f"Could not write: Value:{value}/{builder.to_registers()}, Name:{self.entity_description.key}, Address:{self._address}")
+        #the hub decodes the confirmed value into _data and updates the state
+        registers = await self._hub.async_write_registers(self._slaveId, self._address, payload)
+        if registers is None:
+            _LOGGER.error(f"Could not write: Value:{value}/{payload}, Name:{self.entity_description.key}, Address:{self._address}")
             return
-
-        self._data = builder.to_registers()[0]
-        self.async_write_ha_state()